@@ -4,7 +4,24 @@ from discord import app_commands
 import sqlite3
 import os
 import re
+import time
+import queue
+import asyncio
+import threading
+import traceback
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import chain
+from pathlib import Path
+from types import SimpleNamespace
+import heapq
+import mmap
+import struct
+import numpy as np
 from dotenv import load_dotenv
+from sync import split_terms  # the catalog splits old text columns exactly like the sync does
 
 load_dotenv()
 
@@ -83,126 +100,803 @@ intents.message_content = True
 bot = commands.Bot(command_prefix="!", intents=intents)
 
 # ======================
-# DATABASE HELPERS
+# DATABASE CONNECTIONS
 # ======================
-def db_search(query: str, card_type: str = None, rarity: str = None, limit: int = 10):
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    like = f"%{query}%"
+READ_PRAGMAS = (
+    "PRAGMA query_only = ON",
+    "PRAGMA mmap_size = 268435456",  # map the whole DB instead of copying pages in
+    "PRAGMA cache_size = -16000",    # 16 MB page cache per connection
+    "PRAGMA temp_store = MEMORY",
+)
+
+WRITE_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",     # readers (and sync.py) never block each other
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+)
+
+DB_WORKERS    = 4      # threads running blocking DB work off the event loop
+QUERY_TIMEOUT = 5.0    # seconds before a query is interrupted
+
+class ConnectionManager:
+    """Long-lived SQLite connections for the bot process.
+
+    `read()` hands out a pooled read-only connection (URI mode=ro) and `write()` the
+    single writer connection, committing on success and rolling back on error.
+    Connections are never closed between calls, so each one keeps sqlite3's
+    prepared-statement cache warm for the queries the bot runs over and over.
+
+    Command handlers never touch connections on the event loop: they `await
+    db.run(fn, ...)`, which runs `fn` on a small worker pool with a deadline.
+    """
+
+    def __init__(self, path: str, readers: int = DB_WORKERS):
+        self.path = path
+        self.readers = readers
+        self._pool = queue.LifoQueue()
+        self._writer = None
+        self._write_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="db")
+        self._local = threading.local()
+
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        if readonly:
+            target, pragmas = f"{Path(self.path).resolve().as_uri()}?mode=ro", READ_PRAGMAS
+        else:
+            target, pragmas = self.path, WRITE_PRAGMAS
+        conn = sqlite3.connect(target, uri=readonly, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        for pragma in pragmas:
+            conn.execute(pragma)
+        # Checked every 1000 VM steps — aborts the running query once its deadline passes
+        conn.set_progress_handler(self._past_deadline, 1000)
+        return conn
+
+    def _past_deadline(self) -> bool:
+        deadline = getattr(self._local, "deadline", None)
+        return deadline is not None and time.monotonic() > deadline
+
+    def _call(self, fn, args, timeout):
+        self._local.deadline = time.monotonic() + timeout
+        try:
+            return fn(*args)
+        except sqlite3.OperationalError as e:
+            if str(e) == "interrupted":
+                raise asyncio.TimeoutError(f"{fn.__name__} took longer than {timeout}s") from e
+            raise
+        finally:
+            self._local.deadline = None
+
+    async def run(self, fn, *args, timeout: float = QUERY_TIMEOUT):
+        """Run blocking DB work `fn(*args)` on the worker pool.
+
+        Raises asyncio.TimeoutError if it takes longer than `timeout` seconds; any
+        query still running at that point is interrupted by SQLite itself.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._call, fn, args, timeout)
+        return await asyncio.wait_for(future, timeout + 1)
+
+    @contextmanager
+    def read(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect(readonly=True)
+        try:
+            yield conn
+        finally:
+            if self._pool.qsize() < self.readers:
+                self._pool.put(conn)
+            else:
+                conn.close()
+
+    @contextmanager
+    def write(self):
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._connect(readonly=False)
+            try:
+                yield self._writer
+                self._writer.commit()
+            except Exception:
+                self._writer.rollback()
+                raise
+
+db = ConnectionManager(DB_PATH)
+
+# ======================
+# CARD CATALOG
+# ======================
+# Rarity order used everywhere cards are listed: LR > UR > SSR > SR > everything else
+RARITY_RANK = {"LR": 1, "UR": 2, "SSR": 3, "SR": 4}
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace so lookups ignore case and spacing"""
+    return " ".join((text or "").lower().split())
+
+class CardCatalog:
+    """In-memory copy of the cards table, built once in on_ready and after every sync.
+
+    Cards are kept in rarity order (then by id, like a table scan), and every index
+    stores positions into that list so filtered results come out already sorted.
+    """
+
+    def __init__(self):
+        self.cards = []
+        self.by_id = {}
+        self.by_page_title = {}
+        self.by_name = {}
+        self.by_title = {}
+        self.by_type = {}
+        self.by_rarity = {}
+        self.superseded = set() # positions of URs that have an LR of the same character
+        self.position = {}      # card id -> position in self.cards
+        self.links = {}         # card id -> tuple of link skill names, in wiki order
+        self.categories = {}    # card id -> tuple of category names, in wiki order
+        self.category_names = []  # every category name, sorted
+        self.last_sync = None
+        self.version = 0        # bumped on every load so caches on the event loop know to clear
+        self.indexes = []       # derived indexes, each rebuilt by load() from the new catalog
+        self._load_lock = threading.Lock()
+        self._search_text = []  # "name\ntitle\npage_title", lowercased
+        self._slot_text = []    # "name\ntitle", lowercased
+
+    def __len__(self):
+        return len(self.cards)
+
+    def load(self):
+        """(Re)build the catalog from the database, then every derived index from the catalog.
+
+        Derived indexes keep whatever cards they were built from in one state they swap
+        in at the end of their rebuild, so a lookup racing this load (from another
+        worker thread) sees either all-old or all-new positions, never a mix.
+        """
+        with self._load_lock:
+            self._load()
+            for index in self.indexes:
+                index.rebuild()
+
+    def _load(self):
+        rows, links, categories = [], None, None
+        if os.path.exists(DB_PATH):
+            with db.read() as conn:
+                try:
+                    rows = conn.execute("SELECT * FROM cards").fetchall()
+                except sqlite3.OperationalError:
+                    rows = []
+                links = self._load_terms(conn, "card_links", "link_skills", "link_id")
+                categories = self._load_terms(conn, "card_categories", "categories", "category_id")
+        if not rows or links is None:
+            # DB hasn't been through a sync that fills the join tables — split the text columns
+            links = {r["id"]: tuple(split_terms(r["links"])) for r in rows}
+            categories = {r["id"]: tuple(split_terms(r["categories"])) for r in rows}
+
+        rows.sort(key=lambda r: (RARITY_RANK.get(r["rarity"], 5), r["id"]))
+
+        cards, by_id, by_page_title, by_name, by_title, by_type, by_rarity = [], {}, {}, {}, {}, {}, {}
+        search_text, slot_text, position = [], [], {}
+        last_sync = None
+        if rows and "is_superseded" in rows[0].keys():
+            superseded = {pos for pos, card in enumerate(rows) if card["is_superseded"]}
+        else:
+            # DB hasn't been through a sync that stores the flag yet — work it out here
+            lr_names = {r["name"].strip().lower() for r in rows if r["rarity"] == "LR" and r["name"]}
+            superseded = {
+                pos for pos, card in enumerate(rows)
+                if card["rarity"] == "UR" and card["name"] and card["name"].strip().lower() in lr_names
+            }
+        for pos, card in enumerate(rows):
+            cards.append(card)
+            by_id[card["id"]] = card
+            position[card["id"]] = pos
+            by_page_title[card["page_title"]] = card
+            if card["name"]:
+                by_name.setdefault(normalize(card["name"]), []).append(pos)
+            if card["title"]:
+                by_title.setdefault(normalize(card["title"]), []).append(pos)
+            by_type.setdefault(card["type"], []).append(pos)
+            by_rarity.setdefault(card["rarity"], []).append(pos)
+            name_title = f"{card['name'] or ''}\n{card['title'] or ''}".lower()
+            slot_text.append(name_title)
+            search_text.append(f"{name_title}\n{card['page_title'] or ''}".lower())
+            if card["synced_at"] and (last_sync is None or card["synced_at"] > last_sync):
+                last_sync = card["synced_at"]
+
+        # Swap everything in at once so lookups never see a half-built catalog
+        self.cards, self.by_id, self.by_page_title = cards, by_id, by_page_title
+        self.by_name, self.by_title = by_name, by_title
+        self.by_type, self.by_rarity = by_type, by_rarity
+        self.superseded = superseded
+        self.position, self.links, self.categories = position, links, categories
+        self.category_names = sorted({c for cats in categories.values() for c in cats}, key=str.lower)
+        self._search_text, self._slot_text = search_text, slot_text
+        self.last_sync = last_sync
+        self.version += 1
+        print(f"📚 Card catalog loaded: {len(cards)} cards")
+
+    @staticmethod
+    def _load_terms(conn, join_table: str, table: str, key: str):
+        """card id -> tuple of names from one of sync.py's join tables, or None if it's missing"""
+        try:
+            rows = conn.execute(f"""
+                SELECT j.card_id, t.name FROM {join_table} j
+                JOIN {table} t ON t.id = j.{key}
+                ORDER BY j.card_id, j.position
+            """).fetchall()
+        except sqlite3.OperationalError:
+            return None
+        terms = {}
+        for card_id, name in rows:
+            terms.setdefault(card_id, []).append(name)
+        return {card_id: tuple(names) for card_id, names in terms.items()}
+
+    def links_of(self, card) -> tuple:
+        return self.links.get(card["id"], ())
+
+    def categories_of(self, card) -> tuple:
+        return self.categories.get(card["id"], ())
+
+    def positions(self, card_type: str = None, rarity: str = None, hide_superseded: bool = False):
+        """Positions of cards matching the optional type/rarity filters, in rarity order"""
+        if card_type and rarity:
+            by_rarity = set(self.by_rarity.get(rarity.upper(), ()))
+            found = [p for p in self.by_type.get(card_type.upper(), ()) if p in by_rarity]
+        elif card_type:
+            found = self.by_type.get(card_type.upper(), [])
+        elif rarity:
+            found = self.by_rarity.get(rarity.upper(), [])
+        else:
+            found = range(len(self.cards))
+        if hide_superseded:
+            return [p for p in found if p not in self.superseded]
+        return found
+
+    def get(self, page_title: str):
+        return self.by_page_title.get(page_title)
+
+    def search(self, query: str, card_type: str = None, rarity: str = None, limit: int = None,
+               slot_only: bool = False, hide_superseded: bool = False):
+        """Substring search over name, title and page title (same matching as SQL LIKE '%q%')"""
+        q = (query or "").lower()
+        text = self._slot_text if slot_only else self._search_text
+        results = []
+        for pos in self.positions(card_type, rarity, hide_superseded):
+            if q in text[pos]:
+                results.append(self.cards[pos])
+                if limit and len(results) >= limit:
+                    break
+        return results
+
+    def find_exact(self, name: str):
+        """Best card whose title or name is exactly `name` (ignoring case and spacing)"""
+        key = normalize(name)
+        exact = self.by_title.get(key, []) + self.by_name.get(key, [])
+        return self.cards[min(exact)] if exact else None
+
+    def find(self, name: str):
+        """Best single card for a name or title — exact matches first, then substring"""
+        if not name:
+            return None
+        result = self.find_exact(name)
+        if result:
+            return result
+        results = self.search(name, limit=1, slot_only=True)
+        return results[0] if results else None
+
+catalog = CardCatalog()
+
+# ======================
+# SYNERGY MATRIX
+# ======================
+SYNERGY_PATH   = os.path.join(os.path.dirname(DB_PATH), "dokkan.synergy")
+SYNERGY_MAGIC  = b"DKSY"
+SYNERGY_HEADER = struct.Struct("<4sIII")   # magic, version, card count, reserved
+
+class SynergyMatrix:
+    """Card x card shared-link counts written by sync.py, memory-mapped read-only.
 
-    filters = "(name LIKE ? OR title LIKE ? OR page_title LIKE ?)"
-    params = [like, like, like]
+    Re-mapped whenever the catalog reloads, so it always matches the last sync.
+    Lookups return None when the file is missing or doesn't cover a card, and
+    callers fall back to counting links themselves.
+    """
 
+    def __init__(self):
+        self.state = ({}, None)   # (card id -> row/column, uint8 view straight onto the mapped file)
+        self.mapped = None        # the mmap behind self.state
+
+    def rebuild(self):
+        index, matrix, mapped = {}, None, None
+        try:
+            with open(SYNERGY_PATH, "rb") as f:
+                if os.name == "nt":
+                    # Windows can't replace a file that's mapped, which sync.py does every run
+                    mapped = f.read()
+                else:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count, _ = SYNERGY_HEADER.unpack_from(mapped)
+            if magic == SYNERGY_MAGIC and version == 1:
+                ids = np.frombuffer(mapped, dtype="<i8", count=count, offset=SYNERGY_HEADER.size)
+                matrix = np.frombuffer(mapped, dtype=np.uint8, count=count * count,
+                                       offset=SYNERGY_HEADER.size + 8 * count).reshape(count, count)
+                index = {int(card_id): i for i, card_id in enumerate(ids)}
+        except (OSError, ValueError, struct.error):
+            index, matrix, mapped = {}, None, None
+        old, self.mapped = self.mapped, mapped
+        self.state = (index, matrix)
+
+        # Unmap the previous file now rather than whenever it gets collected. A lookup
+        # still holding a view onto it makes close() fail; the map then goes with that view.
+        if isinstance(old, mmap.mmap):
+            try:
+                old.close()
+            except BufferError:
+                pass
+
+    @staticmethod
+    def _rows(index: dict, matrix, cards: list):
+        if matrix is None:
+            return None
+        try:
+            return [index[card["id"]] for card in cards]
+        except KeyError:
+            return None
+
+    def rows_for(self, cards: list):
+        """Matrix rows for these cards, or None if the file doesn't cover all of them"""
+        return self._rows(*self.state, cards)
+
+    def submatrix(self, cards: list):
+        """Shared-link counts between every pair of these cards, or None"""
+        index, matrix = self.state
+        rows = self._rows(index, matrix, cards)
+        if rows is None:
+            return None
+        return matrix[np.ix_(rows, rows)]
+
+    def shared(self, a, b):
+        """Number of links two cards share, or None"""
+        index, matrix = self.state
+        rows = self._rows(index, matrix, [a, b])
+        return None if rows is None else int(matrix[rows[0], rows[1]])
+
+synergy = SynergyMatrix()
+catalog.indexes.append(synergy)
+
+# ======================
+# DATABASE HELPERS
+# ======================
+def fts_search(query: str, columns: str, card_type: str = None, rarity: str = None, limit: int = 10,
+               hide_superseded: bool = False):
+    """Ranked substring search through the cards_fts trigram index (built by sync.py).
+
+    Results are ordered LR > UR > SSR > SR first, then by bm25 relevance. Returns None
+    when the index can't answer — queries shorter than a trigram, or a DB that
+    hasn't been through a sync since the index was added.
+    """
+    phrase = query.strip().replace('"', '""')
+    if len(phrase) < 3:
+        return None
+    filters = "cards_fts MATCH ?"
+    params = [f'{{{columns}}} : "{phrase}"']
     if card_type:
-        filters += " AND type = ?"
+        filters += " AND c.type = ?"
         params.append(card_type.upper())
     if rarity:
-        filters += " AND rarity = ?"
+        filters += " AND c.rarity = ?"
         params.append(rarity.upper())
+    if hide_superseded:
+        filters += " AND c.is_superseded = 0"
+    params.append(limit)
+
+    with db.read() as conn:
+        try:
+            ids = conn.execute(f"""
+                SELECT c.id FROM cards_fts
+                JOIN cards c ON c.id = cards_fts.rowid
+                WHERE {filters}
+                ORDER BY CASE c.rarity
+                    WHEN 'LR'  THEN 1
+                    WHEN 'UR'  THEN 2
+                    WHEN 'SSR' THEN 3
+                    WHEN 'SR'  THEN 4
+                    ELSE 5
+                END, bm25(cards_fts, 10.0, 10.0, 5.0, 1.0)
+                LIMIT ?
+            """, params).fetchall()
+        except sqlite3.OperationalError:
+            return None
+    return [catalog.by_id[i] for (i,) in ids if i in catalog.by_id]
 
-    params.append(limit * 3)  # fetch extra to account for filtering
-    results = c.execute(f"""
-        SELECT * FROM cards
-        WHERE {filters}
-        ORDER BY CASE rarity
-            WHEN 'LR'  THEN 1
-            WHEN 'UR'  THEN 2
-            WHEN 'SSR' THEN 3
-            WHEN 'SR'  THEN 4
-            ELSE 5
-        END
-        LIMIT ?
-    """, params).fetchall()
-
-    # Filter out UR cards that have an LR version with the same character name
-    if not rarity:  # only filter if user didn't explicitly request a rarity
-        lr_names = set()
-        for card in results:
-            if card["rarity"] == "LR" and card["name"]:
-                lr_names.add(card["name"].strip().lower())
-
-        filtered = []
-        for card in results:
-            if card["rarity"] == "UR" and card["name"] and card["name"].strip().lower() in lr_names:
-                continue  # skip this UR, an LR version exists
-            filtered.append(card)
-        results = filtered
-
-    conn.close()
+def db_search(query: str, card_type: str = None, rarity: str = None, limit: int = 10):
+    # URs with an LR version of the same character are hidden unless the user asked for a rarity
+    hide = not rarity
+    results = fts_search(query, "name title page_title", card_type, rarity, limit, hide_superseded=hide)
+    if results is None:
+        results = catalog.search(query, card_type, rarity, limit=limit, hide_superseded=hide)
+    elif not results:
+        # Nothing by name — fall back to super attack names ("Kamehameha", "Final Flash")
+        results = fts_search(query, "sa_name", card_type, rarity, limit, hide_superseded=hide) or []
     return results[:limit]
 
+FILTER_STATS = {"HP": "hp", "ATK": "atk", "DEF": "def"}
+
+def filter_cards(stat: str, min_value: int = None, max_value: int = None, card_type: str = None,
+                 rarity: str = None, sort_by: str = None, eza: bool = False, limit: int = 10):
+    """Cards whose max (or EZA max) stat is within [min_value, max_value], highest sort_by first.
+
+    With a type and rarity this is a range scan on the (type, rarity, stat) indexes built
+    by sync.py. Returns None on a DB that hasn't been synced since the numeric columns were added.
+    """
+    prefix = "eza_max_" if eza else "max_"
+    stat_col = f"{prefix}{FILTER_STATS[stat]}_num"
+    sort_col = f"{prefix}{FILTER_STATS[sort_by or stat]}_num"
+    filters = [f"{stat_col} IS NOT NULL"]
+    params = []
+    if card_type:
+        filters.append("type = ?")
+        params.append(card_type.upper())
+    if rarity:
+        filters.append("rarity = ?")
+        params.append(rarity.upper())
+    else:
+        filters.append("is_superseded = 0")
+    if min_value is not None:
+        filters.append(f"{stat_col} >= ?")
+        params.append(min_value)
+    if max_value is not None:
+        filters.append(f"{stat_col} <= ?")
+        params.append(max_value)
+    params.append(limit)
+
+    with db.read() as conn:
+        try:
+            ids = conn.execute(f"""
+                SELECT id FROM cards
+                WHERE {" AND ".join(filters)}
+                ORDER BY {sort_col} DESC, id
+                LIMIT ?
+            """, params).fetchall()
+        except sqlite3.OperationalError:
+            return None
+    return [catalog.by_id[i] for (i,) in ids if i in catalog.by_id]
+
 def db_get_card(page_title: str):
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    result = c.execute("SELECT * FROM cards WHERE page_title = ?", (page_title,)).fetchone()
-    conn.close()
-    return result
+    return catalog.get(page_title)
 
 def db_count():
-    conn = sqlite3.connect(DB_PATH)
-    count = conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
-    last_sync = conn.execute("SELECT MAX(synced_at) FROM cards").fetchone()[0]
-    conn.close()
-    return count, last_sync
+    return len(catalog), catalog.last_sync
 
 def db_exists():
-    if not os.path.exists(DB_PATH):
-        return False
-    conn = sqlite3.connect(DB_PATH)
-    count = conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
-    conn.close()
-    return count > 0
+    return len(catalog) > 0
+
+SLOT_COLUMNS = ["leader", "card2", "card3", "card4", "card5", "card6", "friend_unit"]
 
 def init_community_db():
     """Create community_teams table if it doesn't exist"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS community_teams (
-            id          INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id     TEXT NOT NULL,
-            username    TEXT NOT NULL,
-            server_id   TEXT,
-            server_name TEXT,
-            event       TEXT NOT NULL,
-            leader      TEXT,
-            card2       TEXT, card3 TEXT, card4 TEXT,
-            card5       TEXT, card6 TEXT,
-            friend_unit TEXT,
-            description TEXT,
-            submitted_at TEXT DEFAULT (datetime('now'))
-        )
-    """)
-    # Add friend_unit column if it doesn't exist (for existing DBs)
-    try:
-        conn.execute("ALTER TABLE community_teams ADD COLUMN friend_unit TEXT")
-    except Exception:
-        pass
-    # Add stage column if it doesn't exist (for existing DBs)
-    try:
-        conn.execute("ALTER TABLE community_teams ADD COLUMN stage TEXT")
-    except Exception:
-        pass
-    conn.commit()
-    conn.close()
-
-def find_card_url(name: str) -> str:
-    """Look up a card's wiki URL from the DB by name or title"""
+    with db.write() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS community_teams (
+                id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id     TEXT NOT NULL,
+                username    TEXT NOT NULL,
+                server_id   TEXT,
+                server_name TEXT,
+                event       TEXT NOT NULL,
+                leader      TEXT,
+                card2       TEXT, card3 TEXT, card4 TEXT,
+                card5       TEXT, card6 TEXT,
+                friend_unit TEXT,
+                description TEXT,
+                submitted_at TEXT DEFAULT (datetime('now'))
+            )
+        """)
+        # Add friend_unit column if it doesn't exist (for existing DBs)
+        try:
+            conn.execute("ALTER TABLE community_teams ADD COLUMN friend_unit TEXT")
+        except Exception:
+            pass
+        # Add stage column if it doesn't exist (for existing DBs)
+        try:
+            conn.execute("ALTER TABLE community_teams ADD COLUMN stage TEXT")
+        except Exception:
+            pass
+        # page_title each slot resolved to — NULL while it doesn't match a card yet
+        for col in SLOT_COLUMNS:
+            try:
+                conn.execute(f"ALTER TABLE community_teams ADD COLUMN {col}_page TEXT")
+            except Exception:
+                pass
+        # catalog.last_sync the slots were last resolved against — NULL if never
+        try:
+            conn.execute("ALTER TABLE community_teams ADD COLUMN slots_resolved_sync TEXT")
+        except Exception:
+            pass
+
+        # Events normalized to ids, with a per-event team count kept up to date by triggers
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS community_events (
+                id         INTEGER PRIMARY KEY,
+                name       TEXT NOT NULL UNIQUE COLLATE NOCASE,
+                team_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        try:
+            conn.execute("ALTER TABLE community_teams ADD COLUMN event_id INTEGER REFERENCES community_events(id)")
+            migrated = True
+        except Exception:
+            migrated = False
+        if migrated:
+            conn.execute("INSERT OR IGNORE INTO community_events (name) SELECT DISTINCT event FROM community_teams")
+            conn.execute("""
+                UPDATE community_teams SET event_id = e.id
+                FROM community_events e WHERE e.name = community_teams.event
+            """)
+            conn.execute("""
+                UPDATE community_events SET team_count =
+                    (SELECT COUNT(*) FROM community_teams t WHERE t.event_id = community_events.id)
+            """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_community_event ON community_teams(event_id, submitted_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_community_user ON community_teams(user_id, submitted_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_community_submitted ON community_teams(submitted_at)")
+        # One statement per execute — executescript() would commit the open transaction first
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS community_teams_count_insert AFTER INSERT ON community_teams BEGIN
+                UPDATE community_events SET team_count = team_count + 1 WHERE id = new.event_id;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS community_teams_count_delete AFTER DELETE ON community_teams BEGIN
+                UPDATE community_events SET team_count = team_count - 1 WHERE id = old.event_id;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS community_teams_count_update AFTER UPDATE OF event_id ON community_teams BEGIN
+                UPDATE community_events SET team_count = team_count - 1 WHERE id = old.event_id;
+                UPDATE community_events SET team_count = team_count + 1 WHERE id = new.event_id;
+            END
+        """)
+
+def community_event_id(conn, name: str) -> int:
+    """Id of a community event, registering it on first use"""
+    conn.execute("INSERT INTO community_events (name) VALUES (?) ON CONFLICT(name) DO NOTHING", (name,))
+    return conn.execute("SELECT id FROM community_events WHERE name = ?", (name,)).fetchone()[0]
+
+def resolve_slot_pages(slots: list) -> list:
+    """page_title for each free-text slot (None for an empty slot or one that matches no card)"""
+    pages = []
+    for slot in slots:
+        card = resolve_card(slot) if slot else None
+        pages.append(card["page_title"] if card else None)
+    return pages
+
+def backfill_slot_pages():
+    """Resolve community team slots that have no card yet, once per catalog sync.
+
+    Covers teams from before slots were stored as page titles, and slots naming a
+    card that hadn't been synced when the team was submitted.
+    """
+    if not len(catalog):
+        return
+    unresolved = " OR ".join(f"({col} <> '' AND {col}_page IS NULL)" for col in SLOT_COLUMNS)
+    with db.read() as conn:
+        rows = conn.execute(f"""
+            SELECT id, {", ".join(SLOT_COLUMNS)} FROM community_teams
+            WHERE slots_resolved_sync IS NULL OR (slots_resolved_sync < ? AND ({unresolved}))
+        """, (catalog.last_sync or "",)).fetchall()
+    if not rows:
+        return
+    updates = [
+        (*resolve_slot_pages([row[col] for col in SLOT_COLUMNS]), catalog.last_sync, row["id"])
+        for row in rows
+    ]
+    with db.write() as conn:
+        # Slots that already point at a card keep it
+        conn.executemany(f"""
+            UPDATE community_teams SET
+                {", ".join(f"{col}_page = COALESCE(NULLIF({col}_page, ''), ?)" for col in SLOT_COLUMNS)},
+                slots_resolved_sync = ?
+            WHERE id = ?
+        """, updates)
+    print(f"🔗 Resolved card slots for {len(rows)} community teams")
+
+def slot_card(row, col: str):
+    """Card for a community team slot — from its stored page_title, resolving the text if that's missing or gone"""
+    page = row[f"{col}_page"] if f"{col}_page" in row.keys() else None
+    card = catalog.get(page) if page else None
+    return card or resolve_card(row[col])
+
+def resolve_card(name: str):
+    """Best card for a free-text name or title — exact match, then ranked substring match"""
     if not name:
         return None
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    like = f"%{name}%"
-    result = conn.execute("""
-        SELECT wiki_url, title, name, rarity FROM cards
-        WHERE name LIKE ? OR title LIKE ?
-        ORDER BY CASE rarity
-            WHEN 'LR' THEN 1 WHEN 'UR' THEN 2 WHEN 'SSR' THEN 3 ELSE 4
-        END LIMIT 1
-    """, (like, like)).fetchone()
-    conn.close()
-    return (result["wiki_url"], result["title"] or result["name"], result["rarity"]) if result else (None, name, None)
+    result = catalog.find_exact(name)
+    if result:
+        return result
+    results = fts_search(name, "name title", limit=1)
+    if results is None:
+        return catalog.find(name)
+    return results[0] if results else None
+
+# ======================
+# FUZZY SUGGESTIONS
+# ======================
+def trigrams(text: str) -> set:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance where swapping two neighbouring letters counts as one edit.
+
+    Bit-parallel (Hyyrö's variant of Myers' algorithm): one pass over `b`, with
+    every row of the DP table for `a` packed into a single integer.
+    """
+    if not a:
+        return len(b)
+    peq = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    mask = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    vp, vn, d0, pm_prev = mask, 0, 0, 0
+    score = len(a)
+    for ch in b:
+        pm = peq.get(ch, 0)
+        tr = (((~d0) & pm) << 1) & pm_prev
+        d0 = ((((pm & vp) + vp) ^ vp) | pm | vn | tr) & mask
+        hp = (vn | ~(d0 | vp)) & mask
+        hn = d0 & vp
+        if hp & last:
+            score += 1
+        elif hn & last:
+            score -= 1
+        hp = ((hp << 1) | 1) & mask
+        hn = (hn << 1) & mask
+        vp = (hn | ~(d0 | hp)) & mask
+        vn = hp & d0
+        pm_prev = pm
+    return score
+
+class FuzzyMatcher:
+    """Trigram index over card names, titles and the words in names, for "did you mean".
+
+    Rebuilt from the catalog after every sync. A lookup counts shared trigrams through
+    the posting lists, then re-ranks the closest few by edit distance.
+    """
+
+    def __init__(self):
+        # (display form of each term, normalized form of each term,
+        #  trigram count of each term, trigram -> term indexes)
+        self.state = ([], [], [], {})
+
+    def rebuild(self):
+        display = {}
+        for card in catalog.cards:
+            for text in (card["name"], card["title"]):
+                if text:
+                    display.setdefault(normalize(text), text.strip())
+            for word in re.findall(r"[A-Za-z][A-Za-z'\-]{3,}", card["name"] or ""):
+                display.setdefault(word.lower(), word)
+
+        keys = list(display)
+        terms = [display[key] for key in keys]
+        postings = {}
+        sizes = []
+        for i, key in enumerate(keys):
+            grams = trigrams(key)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        self.state = (terms, keys, sizes, postings)
+
+    def suggest(self, query: str, limit: int = 5) -> list:
+        terms, keys, sizes, postings = self.state
+        key = normalize(query)
+        if len(key) < 3:
+            return []
+
+        grams = trigrams(key)
+        shared = Counter(chain.from_iterable(postings.get(gram, ()) for gram in grams))
+
+        # Jaccard similarity of trigram sets, then edit distance on the closest few
+        n = len(grams)
+        closest = heapq.nlargest(12, shared.most_common(60), key=lambda t: t[1] / (n + sizes[t[0]] - t[1]))
+        max_edits = max(1, len(key) // 3)
+        ranked = sorted((edit_distance(key, keys[i]), -count, i) for i, count in closest)
+        return [terms[i] for dist, _, i in ranked if dist <= max_edits][:limit]
+
+fuzzy = FuzzyMatcher()
+catalog.indexes.append(fuzzy)
+
+def did_you_mean(query: str) -> str:
+    """Suggestion line for "no results" messages, or an empty string"""
+    suggestions = fuzzy.suggest(query)
+    if not suggestions:
+        return ""
+    return "\n💡 Did you mean: " + ", ".join(f"**{s}**" for s in suggestions) + "?"
+
+# ======================
+# RESULT CACHE
+# ======================
+class ResultCache:
+    """Short-lived cache of slash command results, keyed by (command, normalized arguments).
+
+    Empty results are cached too, for less time. Identical requests that arrive
+    while one is still running share its result. Everything is dropped when the
+    catalog reloads — after auto_sync, or once watch_sync sees cards.synced_at move
+    forward from a sync run outside the bot — so nothing outlives a sync for long.
+    """
+
+    def __init__(self, ttl: float = 300, negative_ttl: float = 60, max_weight: int = 20000):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_weight = max_weight   # total result items held, a stand-in for memory
+        self.entries = OrderedDict()   # key -> (expires, weight, result)
+        self.weight = 0
+        self.pending = {}              # key -> future for a result still being computed
+        self.version = catalog.version
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.entries.clear()
+        self.weight = 0
+        self.version = catalog.version
+
+    @staticmethod
+    def _key(command: str, args: tuple):
+        return (command,) + tuple(normalize(a) if isinstance(a, str) else a for a in args)
+
+    @staticmethod
+    def _weight(result) -> int:
+        return 1 + (len(result) if isinstance(result, (list, tuple)) else 0)
+
+    async def run(self, command: str, args: tuple, fn, *fn_args, **kwargs):
+        """Result of `await db.run(fn, *fn_args)`, reused for identical (command, args)"""
+        if self.version != catalog.version:
+            self.clear()
+        key = self._key(command, args)
+        entry = self.entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[2]
+        if key in self.pending:
+            self.hits += 1
+            return await asyncio.shield(self.pending[key])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        version = catalog.version
+        try:
+            result = await db.run(fn, *fn_args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()   # mark retrieved — waiters re-raise it themselves
+            raise
+        finally:
+            del self.pending[key]
+        future.set_result(result)
+
+        if version == catalog.version:
+            self._store(key, result)
+        return result
+
+    def _store(self, key, result):
+        if key in self.entries:
+            self.weight -= self.entries.pop(key)[1]
+        ttl = self.ttl if result else self.negative_ttl
+        weight = self._weight(result)
+        self.entries[key] = (time.monotonic() + ttl, weight, result)
+        self.weight += weight
+        while self.weight > self.max_weight and self.entries:
+            self.weight -= self.entries.popitem(last=False)[1][1]
+
+result_cache = ResultCache()
 
 # ======================
 # ON READY
@@ -214,7 +908,10 @@ SERVER_LIST_CHANNEL_ID = 1484122195260342383  # Replace with your text channel I
 
 @bot.event
 async def on_ready():
-    init_community_db()
+    await db.run(init_community_db)
+    await db.run(init_banner_db)
+    await db.run(catalog.load, timeout=60)
+    await db.run(backfill_slot_pages, timeout=60)
     await bot.tree.sync()
     print(f"✅ Logged in as {bot.user}")
     if not db_exists():
@@ -226,8 +923,22 @@ async def on_ready():
     if not auto_sync.is_running():
         auto_sync.start()
         print("🔄 Auto-sync task started (every 8 hours)")
+    if not watch_sync.is_running():
+        watch_sync.start()
     await update_server_list()
 
+@bot.tree.error
+async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    """Tell the user when a command gave up waiting on the database"""
+    if not isinstance(getattr(error, "original", error), asyncio.TimeoutError):
+        traceback.print_exception(error)
+        return
+    msg = "⏳ The database is busy right now — please try again in a moment."
+    if interaction.response.is_done():
+        await interaction.followup.send(msg, ephemeral=True)
+    else:
+        await interaction.response.send_message(msg, ephemeral=True)
+
 @tasks.loop(hours=8)
 async def auto_sync():
     print("🔄 Running scheduled --update sync...")
@@ -243,6 +954,7 @@ async def auto_sync():
             print(stdout.decode())
         if stderr:
             print(stderr.decode())
+        await reload_catalog()
         print("✅ Scheduled sync complete!")
     except Exception as e:
         print(f"❌ Scheduled sync failed: {e}")
@@ -251,6 +963,37 @@ async def auto_sync():
 async def before_auto_sync():
     await bot.wait_until_ready()
 
+SYNC_WATCH_INTERVAL = 60   # seconds between checks for syncs run outside the bot
+
+async def reload_catalog():
+    """Reload the catalog (and every index built from it) and drop cached results"""
+    await db.run(catalog.load, timeout=60)
+    await db.run(backfill_slot_pages, timeout=60)
+    result_cache.clear()
+
+def latest_synced_at():
+    """Newest cards.synced_at in the database, or None"""
+    try:
+        with db.read() as conn:
+            return conn.execute("SELECT MAX(synced_at) FROM cards").fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+
+@tasks.loop(seconds=SYNC_WATCH_INTERVAL)
+async def watch_sync():
+    """Reload once cards.synced_at moves past the catalog's — python sync.py run by hand or from cron"""
+    try:
+        latest = await db.run(latest_synced_at)
+        if latest and (catalog.last_sync is None or latest > catalog.last_sync):
+            print(f"🔄 Cards synced outside the bot (up to {latest}) — reloading the catalog")
+            await reload_catalog()
+    except Exception as e:
+        print(f"❌ Sync check failed: {e}")
+
+@watch_sync.before_loop
+async def before_watch_sync():
+    await bot.wait_until_ready()
+
 async def update_server_count():
     if SERVER_COUNT_CHANNEL_ID == 0:
         return
@@ -400,15 +1143,13 @@ def build_card_embed(card):
     if card["passive_skill"]:
         embed.add_field(name="✨ Passive Skill", value=card["passive_skill"][:1024], inline=False)
 
-    if card["links"]:
-        links = [l.strip() for l in card["links"].replace("|", " - ").split(" - ") if l.strip()]
-        if links:
-            embed.add_field(name="🔗 Link Skills", value="  •  ".join(links[:8]), inline=False)
+    links = catalog.links_of(card)
+    if links:
+        embed.add_field(name="🔗 Link Skills", value="  •  ".join(links[:8]), inline=False)
 
-    if card["categories"]:
-        cats = [c.strip() for c in card["categories"].replace("|", " - ").split(" - ") if c.strip()]
-        if cats:
-            embed.add_field(name="📁 Categories", value="  •  ".join(cats[:10]), inline=False)
+    cats = catalog.categories_of(card)
+    if cats:
+        embed.add_field(name="📁 Categories", value="  •  ".join(cats[:10]), inline=False)
 
     if card["image"]:
         embed.set_thumbnail(url=card["image"])
@@ -416,6 +1157,45 @@ def build_card_embed(card):
     embed.set_footer(text="Dokkan Battle Wiki  •  Click the title to view full card page")
     return embed
 
+
+class RenderCache:
+    """LRU of rendered card embeds, stored as embed dicts.
+
+    Keyed by (kind, page_title, synced_at), so a re-synced card never gets its old
+    embed back; entries for cards a sync touched are dropped when the catalog reloads.
+    """
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+
+    def _prune(self):
+        for key in [k for k in self.entries if (card := catalog.get(k[1])) is None or card["synced_at"] != k[2]]:
+            del self.entries[key]
+        self.version = catalog.version
+
+    def embed(self, kind: str, card, build) -> discord.Embed:
+        """build(card) as a fresh Embed, rendered at most once per version of the card"""
+        if self.version != catalog.version:
+            self._prune()
+        key = (kind, card["page_title"], card["synced_at"])
+        data = self.entries.get(key)
+        if data is None:
+            self.misses += 1
+            data = build(card).to_dict()
+            self.entries[key] = data
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return discord.Embed.from_dict(data)
+
+render_cache = RenderCache()
+
 # ======================
 # ======================
 # /card
@@ -447,17 +1227,17 @@ async def card_lookup(interaction: discord.Interaction, name: str, card_type: st
     if not db_exists():
         return await interaction.followup.send("❌ Database is empty! Run `python sync.py` first.", ephemeral=True)
 
-    results = db_search(name, card_type, rarity)
+    results = await result_cache.run("search", (name, card_type, rarity, 10), db_search, name, card_type, rarity)
 
     if not results:
         msg = f"❌ No results found for **{name}**"
         parts = [x for x in [card_type, rarity] if x]
         if parts:
             msg += f" ({' • '.join(parts)})"
-        return await interaction.followup.send(msg + ". Try a different search term.", ephemeral=True)
+        return await interaction.followup.send(msg + ". Try a different search term." + did_you_mean(name), ephemeral=True)
 
     if len(results) == 1:
-        return await interaction.followup.send(embed=build_card_embed(results[0]))
+        return await interaction.followup.send(embed=render_cache.embed("card", results[0], build_card_embed))
 
     parts = [x for x in [card_type, rarity] if x]
     embed = discord.Embed(
@@ -497,7 +1277,87 @@ async def card_by_url(interaction: discord.Interaction, url: str):
             ephemeral=True
         )
 
-    await interaction.followup.send(embed=build_card_embed(card))
+    await interaction.followup.send(embed=render_cache.embed("card", card, build_card_embed))
+
+# ======================
+# /filter
+# ======================
+@bot.tree.command(name="filter", description="Find cards by stat range, e.g. PHY LRs with over 20000 ATK")
+@app_commands.describe(
+    stat="Stat to filter on",
+    min_value="Minimum value of the stat (optional)",
+    max_value="Maximum value of the stat (optional)",
+    card_type="Filter by type (optional)",
+    rarity="Filter by rarity (optional)",
+    sort_by="Stat to sort by, highest first (defaults to the filtered stat)",
+    eza="Use EZA max stats instead of base max stats"
+)
+@app_commands.choices(stat=[
+    app_commands.Choice(name="❤️ HP",  value="HP"),
+    app_commands.Choice(name="⚔️ ATK", value="ATK"),
+    app_commands.Choice(name="🛡️ DEF", value="DEF"),
+])
+@app_commands.choices(sort_by=[
+    app_commands.Choice(name="❤️ HP",  value="HP"),
+    app_commands.Choice(name="⚔️ ATK", value="ATK"),
+    app_commands.Choice(name="🛡️ DEF", value="DEF"),
+])
+@app_commands.choices(card_type=[
+    app_commands.Choice(name="🔵 AGL", value="AGL"),
+    app_commands.Choice(name="🟢 TEQ", value="TEQ"),
+    app_commands.Choice(name="🟣 INT", value="INT"),
+    app_commands.Choice(name="🔴 STR", value="STR"),
+    app_commands.Choice(name="🟠 PHY", value="PHY"),
+])
+@app_commands.choices(rarity=[
+    app_commands.Choice(name="🌟 LR",  value="LR"),
+    app_commands.Choice(name="⭐ UR",  value="UR"),
+    app_commands.Choice(name="💫 SSR", value="SSR"),
+    app_commands.Choice(name="✨ SR",  value="SR"),
+    app_commands.Choice(name="🔹 R",   value="R"),
+    app_commands.Choice(name="⬜ N",   value="N"),
+])
+async def filter_command(interaction: discord.Interaction, stat: str, min_value: int = None, max_value: int = None,
+                         card_type: str = None, rarity: str = None, sort_by: str = None, eza: bool = False):
+    await interaction.response.defer()
+
+    if not db_exists():
+        return await interaction.followup.send("❌ Database is empty! Run `python sync.py` first.", ephemeral=True)
+
+    args = (stat, min_value, max_value, card_type, rarity, sort_by, eza)
+    results = await result_cache.run("filter", args, filter_cards, *args)
+    if results is None:
+        return await interaction.followup.send("❌ Stat filters need a fresh sync — run `python sync.py --update` first.", ephemeral=True)
+
+    prefix = "EZA " if eza else "Max "
+    bounds = []
+    if min_value is not None:
+        bounds.append(f"≥ {min_value:,}")
+    if max_value is not None:
+        bounds.append(f"≤ {max_value:,}")
+    parts = [x for x in [card_type, rarity, f"{prefix}{stat} {' '.join(bounds)}".strip()] if x]
+    if not results:
+        return await interaction.followup.send(f"❌ No cards found for **{' • '.join(parts)}**.", ephemeral=True)
+
+    stat_prefix = "eza_max_" if eza else "max_"
+    embed = discord.Embed(
+        title=f"📈 {' • '.join(parts)}",
+        description=f"Sorted by {prefix}{sort_by or stat}, highest first.",
+        color=discord.Color.gold()
+    )
+    for i, card in enumerate(results, 1):
+        display = card["title"] or card["page_title"]
+        r_emoji = RARITY_EMOJIS.get(get_rarity(card["rarity"] or ""), "⭐")
+        t_emoji = TYPE_EMOJIS.get(clean_type(card["type"] or ""), "⚪")
+        values = {label: card[f"{stat_prefix}{key}_num"] for label, key in FILTER_STATS.items()}
+        stats = " • ".join(f"{label} `{'?' if v is None else f'{v:,}'}`" for label, v in values.items())
+        embed.add_field(
+            name=f"{i}. {r_emoji} {t_emoji} {display}",
+            value=f"{stats}\n[View on Wiki]({card['wiki_url']})",
+            inline=False
+        )
+    embed.set_footer(text="Tip: Add a type and rarity for the fastest results")
+    await interaction.followup.send(embed=embed)
 
 # ======================
 # /dbstats
@@ -511,12 +1371,107 @@ async def db_stats(interaction: discord.Interaction):
     embed = discord.Embed(title="🗄️ Dokkan Database Stats", color=discord.Color.blurple())
     embed.add_field(name="📊 Total Cards", value=f"`{count:,}`", inline=True)
     embed.add_field(name="🕐 Last Synced", value=f"`{last_sync[:19] if last_sync else 'Never'} UTC`", inline=True)
+    embed.add_field(
+        name="🧩 Embed Cache",
+        value=f"`{len(render_cache.entries)}` cached • `{render_cache.hits:,}` hits • `{render_cache.misses:,}` misses",
+        inline=False
+    )
+    embed.add_field(
+        name="⚡ Result Cache",
+        value=f"`{len(result_cache.entries)}` cached • `{result_cache.hits:,}` hits • `{result_cache.misses:,}` misses",
+        inline=False
+    )
     embed.set_footer(text="Run python sync.py --update to add new cards")
     await interaction.response.send_message(embed=embed)
 
 # ======================
 # /links
 # ======================
+class LinkIndex:
+    """Inverted index from link skill to the cards that have it, for /links.
+
+    A card's links are an int bitmask over link ids; posting lists and the type/rarity
+    filters are int bitmasks over catalog positions. Finding partners is a few ANDs
+    and ORs plus one popcount per card that shares at least one link.
+    """
+
+    def __init__(self):
+        self.state = SimpleNamespace(
+            cards=[],        # the catalog positions below point into
+            position={},     # card id -> catalog position
+            links={},        # card id -> link names
+            link_bits={},    # link name -> bit in a card mask
+            card_masks=[],   # catalog position -> bitmask of its links
+            postings={},     # link name -> bitmask of catalog positions
+            by_type={},      # type -> bitmask of catalog positions
+            by_rarity={},    # rarity -> bitmask of catalog positions
+            superseded=0,    # bitmask of superseded URs
+        )
+
+    def rebuild(self):
+        cards, links = catalog.cards, catalog.links
+        link_bits, card_masks, postings, by_type, by_rarity = {}, [], {}, {}, {}
+        for pos, card in enumerate(cards):
+            mask = 0
+            for link in links.get(card["id"], ()):
+                bit = link_bits.setdefault(link, len(link_bits))
+                mask |= 1 << bit
+                postings[link] = postings.get(link, 0) | (1 << pos)
+            card_masks.append(mask)
+        for card_type, positions in catalog.by_type.items():
+            by_type[card_type] = sum(1 << p for p in positions)
+        for rarity, positions in catalog.by_rarity.items():
+            by_rarity[rarity] = sum(1 << p for p in positions)
+        self.state = SimpleNamespace(
+            cards=cards, position=catalog.position, links=links,
+            link_bits=link_bits, card_masks=card_masks, postings=postings,
+            by_type=by_type, by_rarity=by_rarity,
+            superseded=sum(1 << p for p in catalog.superseded),
+        )
+
+    def partners(self, base_card, card_type: str = None, rarity: str = None,
+                 hide_superseded: bool = False, limit: int = 8) -> list:
+        """Top cards by links shared with base_card, as (card, shared links in base_card's order)"""
+        state = self.state
+        base_links = state.links.get(base_card["id"], ())
+        base_pos = state.position.get(base_card["id"])
+        if not base_links or base_pos is None:
+            return []
+
+        candidates = 0
+        for link in base_links:
+            candidates |= state.postings.get(link, 0)
+        candidates &= ~(1 << base_pos)
+        if card_type:
+            candidates &= state.by_type.get(card_type.upper(), 0)
+        if rarity:
+            candidates &= state.by_rarity.get(rarity.upper(), 0)
+        if hide_superseded:
+            candidates &= ~state.superseded
+
+        base_mask, card_masks = state.card_masks[base_pos], state.card_masks
+        scored = []
+        while candidates:
+            low = candidates & -candidates
+            pos = low.bit_length() - 1
+            candidates ^= low
+            scored.append((-(card_masks[pos] & base_mask).bit_count(), pos))
+
+        # Ties keep catalog (rarity) order, like the sort this replaced
+        top = heapq.nsmallest(limit, scored)
+        return [
+            (state.cards[pos], [l for l in base_links if card_masks[pos] >> state.link_bits[l] & 1])
+            for _, pos in top
+        ]
+
+link_index = LinkIndex()
+catalog.indexes.append(link_index)
+
+def find_link_partners(base_card, partner_type: str = None, partner_rarity: str = None, limit: int = 8):
+    """Cards sharing the most link skills with base_card, as (card, shared links)"""
+    # Skip URs that have an LR version unless a rarity was asked for
+    return link_index.partners(base_card, partner_type, partner_rarity, not partner_rarity, limit)
+
 @bot.tree.command(name="links", description="Find the best linking partners for a card")
 @app_commands.describe(
     name="Card name to find linking partners for",
@@ -545,12 +1500,12 @@ async def links_lookup(interaction: discord.Interaction, name: str, partner_type
         return await interaction.followup.send("❌ Database is empty! Run `python sync.py` first.", ephemeral=True)
 
     # Find the base card — no type/rarity filter, just by name
-    results = db_search(name, limit=5)
+    results = await result_cache.run("search", (name, None, None, 5), db_search, name, None, None, 5)
     if not results:
-        return await interaction.followup.send(f"❌ No card found for **{name}**.", ephemeral=True)
+        return await interaction.followup.send(f"❌ No card found for **{name}**." + did_you_mean(name), ephemeral=True)
 
     base_card = results[0]
-    base_links = [l.strip() for l in (base_card["links"] or "").replace("|", " - ").split(" - ") if l.strip()]
+    base_links = list(catalog.links_of(base_card))
     print(f"🔍 /links found card: '{base_card['page_title']}' | links raw: '{base_card['links'][:100] if base_card['links'] else 'EMPTY'}'")
 
     if not base_links:
@@ -559,42 +1514,9 @@ async def links_lookup(interaction: discord.Interaction, name: str, partner_type
             ephemeral=True
         )
 
-    # Search DB for partners — apply type/rarity filters here
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-
-    query = "SELECT * FROM cards WHERE links != '' AND links IS NOT NULL AND page_title != ?"
-    params = [base_card["page_title"]]
-
-    if partner_type:
-        query += " AND type = ?"
-        params.append(partner_type.upper())
-    if partner_rarity:
-        query += " AND rarity = ?"
-        params.append(partner_rarity.upper())
-
-    all_cards = c.execute(query, params).fetchall()
-    conn.close()
-
-    # Score by shared links, filtering out URs that have LR versions
-    lr_names = set()
-    for card in all_cards:
-        if card["rarity"] == "LR" and card["name"]:
-            lr_names.add(card["name"].strip().lower())
-
-    scored = []
-    for card in all_cards:
-        # Skip UR if an LR of the same character exists
-        if not partner_rarity and card["rarity"] == "UR" and card["name"] and card["name"].strip().lower() in lr_names:
-            continue
-        card_links = [l.strip() for l in (card["links"] or "").replace("|", " - ").split(" - ") if l.strip()]
-        shared = [l for l in base_links if l in card_links]
-        if shared:
-            scored.append((card, shared))
-
-    scored.sort(key=lambda x: len(x[1]), reverse=True)
-    top = scored[:8]
+    # Search for partners — apply type/rarity filters here
+    top = await result_cache.run("links", (base_card["id"], partner_type, partner_rarity),
+                                 find_link_partners, base_card, partner_type, partner_rarity)
 
     if not top:
         msg = f"❌ No linking partners found for **{base_card['title'] or base_card['page_title']}**"
@@ -669,40 +1591,185 @@ def extract_leader_category(leader_skill: str) -> list:
 
     return categories
 
+def get_leader_categories(leader) -> list:
+    """Categories the leader skill boosts, from the leader_skills rows sync.py parses (EZA if the base has none)"""
+    with db.read() as conn:
+        try:
+            rows = conn.execute("""
+                SELECT target, eza FROM leader_skills
+                WHERE card_id = ? AND kind = 'category'
+                ORDER BY eza, position
+            """, (leader["id"],)).fetchall()
+        except sqlite3.OperationalError:
+            # DB predates the table — fall back to scanning the text
+            return extract_leader_category(leader["leader_skill"] or "")
+    categories = []
+    for target, eza in rows:
+        if eza == rows[0]["eza"] and target not in categories:
+            categories.append(target)
+    return categories
+
 def score_team(team: list, candidate) -> int:
     """Score a candidate card based on link overlap with current team"""
-    if not candidate["links"]:
-        return 0
-    candidate_links = set(l.strip() for l in candidate["links"].replace("|", " - ").split(" - ") if l.strip())
+    candidate_links = set(catalog.links_of(candidate))
     if not candidate_links:
         return 0
 
     score = 0
     for member in team:
-        if not member["links"]:
-            continue
-        member_links = set(l.strip() for l in member["links"].replace("|", " - ").split(" - ") if l.strip())
-        shared = candidate_links & member_links
-        score += len(shared)
+        score += len(candidate_links.intersection(catalog.links_of(member)))
     return score
 
-def build_best_team(leader, pool: list, team_size: int = 5):
-    """Greedily build best team from pool based on link synergy"""
-    team = [leader]
-    remaining = [c for c in pool if c["page_title"] != leader["page_title"]]
-    honorable = []
+def get_category_pool(categories: list, card_type: str = None) -> list:
+    """Cards with links in any of the leader's categories, without URs superseded by an LR.
+
+    Categories must match exactly (ignoring case) — "Saiyans" is not "Pure Saiyans".
+    """
+    filters = f"cat.name IN ({', '.join('?' for _ in categories)}) AND c.is_superseded = 0"
+    params = list(categories)
+    if card_type:
+        filters += " AND c.type = ?"
+        params.append(card_type.upper())
+    with db.read() as conn:
+        try:
+            ids = conn.execute(f"""
+                SELECT DISTINCT c.id FROM categories cat
+                JOIN card_categories cc ON cc.category_id = cat.id
+                JOIN cards c ON c.id = cc.card_id
+                WHERE {filters}
+            """, params).fetchall()
+        except sqlite3.OperationalError:
+            ids = None
+    if ids is None:
+        # DB predates the join tables — match against the catalog's split categories
+        wanted = {cat.lower() for cat in categories}
+        ids = [
+            (catalog.cards[p]["id"],) for p in catalog.positions(card_type, hide_superseded=True)
+            if wanted.intersection(c.lower() for c in catalog.categories_of(catalog.cards[p]))
+        ]
+    positions = sorted(catalog.position[i] for (i,) in ids if i in catalog.position)
+    return [catalog.cards[p] for p in positions if catalog.links_of(catalog.cards[p])]
+
+def shared_links(cards: list) -> np.ndarray:
+    """cards x cards shared link counts (zero diagonal), from the synergy file when it covers them"""
+    counts = synergy.submatrix(cards)
+    if counts is None:
+        link_ids = {}
+        rows = [[link_ids.setdefault(l, len(link_ids)) for l in catalog.links_of(card)] for card in cards]
+        membership = np.zeros((len(cards), max(len(link_ids), 1)), dtype=np.float32)
+        for i, cols in enumerate(rows):
+            membership[i, cols] = 1
+        counts = membership @ membership.T   # float matmul goes through BLAS
+    counts = counts.astype(np.int32)
+    np.fill_diagonal(counts, 0)
+    return counts
 
-    while len(team) < team_size + 1 and remaining:
-        # Score each candidate against current team
-        scored = [(card, score_team(team, card)) for card in remaining]
-        scored.sort(key=lambda x: x[1], reverse=True)
+def build_best_team(leader, pool: list, team_size: int = 5):
+    """Greedily build best team from pool based on link synergy.
+
+    Each round adds the candidate with the most links shared with the team so far.
+    Pair overlaps come from one shared-link matrix and every candidate's score is
+    kept in a vector, so adding a member is one vector add.
+    Ties go to the candidate that scored higher in the previous round, then the
+    round before, then pool order — the same order repeated stable sorts gave.
+    """
+    candidates = [c for c in pool if c["page_title"] != leader["page_title"]]
+    if not candidates:
+        return [], []
+
+    overlap = shared_links(candidates + [leader])
+    pair, scores = overlap[:-1, :-1], overlap[:-1, -1]
+    history = []   # scores from earlier rounds, most recent last
+    alive = np.ones(len(candidates), dtype=bool)
+    team, honorable = [], []
+
+    while len(team) < team_size and alive.any():
+        best = alive & (scores == scores[alive].max())
+        for previous in reversed(history):
+            if np.count_nonzero(best) == 1:
+                break
+            best &= previous == previous[best].max()
+        pick = int(np.flatnonzero(best)[0])
+        team.append(candidates[pick])
+        alive[pick] = False
+
+        if len(team) == team_size or not alive.any():
+            # Runners-up from the last round, in the order the old sort listed them
+            order = np.lexsort([np.arange(len(candidates))] + [-h for h in history] + [-scores])
+            runners = [i for i in order if alive[i]][:3]
+            honorable = [candidates[i] for i in runners if scores[i] > 0]
+            break
+
+        history.append(scores)
+        scores = scores + pair[pick]
+
+    return team, honorable
+
+OPTIMAL_BUDGET = 0.3  # seconds /team mode:optimal may search for
+
+class _OutOfTime(Exception):
+    pass
+
+def build_optimal_team(leader, pool: list, team_size: int = 5, budget: float = OPTIMAL_BUDGET):
+    """Team with the most shared links across every pair (leader included), by branch and bound.
+
+    Starts from the greedy team and searches until it proves a team optimal or the
+    budget runs out. Returns (team, honorable, total shared links, gap), where gap is
+    how many links better than `total` the best possible team could still be (0 = optimal).
+    """
+    deadline = time.perf_counter() + budget
+    greedy, greedy_honorable = build_best_team(leader, pool, team_size)
+    candidates = [c for c in pool if c["page_title"] != leader["page_title"]]
+    if not candidates:
+        return greedy, greedy_honorable, 0, 0
+
+    overlap = shared_links(candidates + [leader])
+    pair, with_leader = overlap[:-1, :-1], overlap[:-1, -1]
+    size = min(team_size, len(candidates))
+
+    # A member's future contribution is its gain against the team so far plus half its
+    # overlap with the other new members — at most half its top (r-1) pair overlaps
+    top_pairs = -np.sort(-np.partition(pair, -(size - 1), axis=1)[:, -(size - 1):], axis=1)
+    half_top = {r: 0.5 * top_pairs[:, :r - 1].sum(axis=1) for r in range(1, size + 1)}
+
+    index = {c["page_title"]: i for i, c in enumerate(candidates)}
+    best_members = [index[c["page_title"]] for c in greedy]
+    best_total = int(with_leader[best_members].sum() + pair[np.ix_(best_members, best_members)].sum() // 2)
+    open_bounds = []   # bound of the branch being explored at each depth
+
+    def search(members, total, gain, pool_idx, r):
+        nonlocal best_members, best_total
+        bounds = gain[pool_idx] + half_top[r][pool_idx]
+        order = np.argsort(-bounds, kind="stable")
+        pool_idx, bounds = pool_idx[order], bounds[order]
+        # Bound of picking the k-th candidate and the best r-1 after it; falls as k grows
+        window = np.convolve(bounds, np.ones(r), mode="valid")
+        for k in range(len(window)):
+            bound = int(total + window[k] + 1e-9)   # team totals are whole numbers
+            if bound <= best_total:
+                break
+            i = pool_idx[k]
+            if r == 1:
+                best_members, best_total = members + [i], total + int(gain[i])
+                continue
+            # Everything not yet searched is under one of the bounds on this stack
+            open_bounds.append(bound)
+            if time.perf_counter() > deadline:
+                raise _OutOfTime
+            search(members + [i], total + int(gain[i]), gain + pair[i], pool_idx[k + 1:], r - 1)
+            open_bounds.pop()
 
-        best_card, best_score = scored[0]
-        team.append(best_card)
-        honorable = [card for card, s in scored[1:4] if s > 0]
-        remaining = [card for card, _ in scored[1:]]
+    try:
+        search([], 0, with_leader, np.arange(len(candidates)), size)
+        gap = 0
+    except _OutOfTime:
+        gap = max(0, max(open_bounds) - best_total)
 
-    return team[1:], honorable  # exclude leader from team list
+    members = sorted(best_members, key=lambda i: (-(with_leader[i] + pair[i, best_members].sum()), i))
+    gain = with_leader + pair[:, best_members].sum(axis=1)
+    runners = [i for i in np.argsort(-gain, kind="stable") if i not in best_members][:3]
+    honorable = [candidates[i] for i in runners if gain[i] > 0]
+    return [candidates[i] for i in members], honorable, best_total, gap
 
 # ======================
 # /team
@@ -710,7 +1777,8 @@ def build_best_team(leader, pool: list, team_size: int = 5):
 @bot.tree.command(name="team", description="Auto-build a team around a leader card")
 @app_commands.describe(
     leader="The leader card name (e.g. Broly, Super Saiyan Goku)",
-    card_type="Filter team members by type (optional)"
+    card_type="Filter team members by type (optional)",
+    mode="Quick (greedy) or Optimal (searches for the best total link overlap)"
 )
 @app_commands.choices(card_type=[
     app_commands.Choice(name="🔵 AGL", value="AGL"),
@@ -719,16 +1787,20 @@ def build_best_team(leader, pool: list, team_size: int = 5):
     app_commands.Choice(name="🔴 STR", value="STR"),
     app_commands.Choice(name="🟠 PHY", value="PHY"),
 ])
-async def team_builder(interaction: discord.Interaction, leader: str, card_type: str = None):
+@app_commands.choices(mode=[
+    app_commands.Choice(name="⚡ Quick", value="quick"),
+    app_commands.Choice(name="🧠 Optimal", value="optimal"),
+])
+async def team_builder(interaction: discord.Interaction, leader: str, card_type: str = None, mode: str = "quick"):
     await interaction.response.defer()
 
     if not db_exists():
         return await interaction.followup.send("❌ Database is empty! Run `python sync.py` first.", ephemeral=True)
 
     # Find leader card
-    leader_results = db_search(leader, card_type=card_type, limit=5)
+    leader_results = await result_cache.run("search", (leader, card_type, None, 5), db_search, leader, card_type, None, 5)
     if not leader_results:
-        return await interaction.followup.send(f"❌ No card found for **{leader}**.", ephemeral=True)
+        return await interaction.followup.send(f"❌ No card found for **{leader}**." + did_you_mean(leader), ephemeral=True)
 
     leader_card = leader_results[0]
     leader_title = leader_card["title"] or leader_card["page_title"]
@@ -737,7 +1809,7 @@ async def team_builder(interaction: discord.Interaction, leader: str, card_type:
 
     # Extract categories from leader skill
     leader_skill = leader_card["leader_skill"] or ""
-    categories = extract_leader_category(leader_skill)
+    categories = await result_cache.run("leader_categories", (leader_card["id"],), get_leader_categories, leader_card)
 
     if not categories:
         return await interaction.followup.send(
@@ -746,33 +1818,8 @@ async def team_builder(interaction: discord.Interaction, leader: str, card_type:
             ephemeral=True
         )
 
-    # Find all cards in those categories
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-
-    category_filter = " OR ".join(["categories LIKE ?" for _ in categories])
-    params = [f"%{cat}%" for cat in categories]
-
-    if card_type:
-        query = f"SELECT * FROM cards WHERE ({category_filter}) AND type = ? AND links != '' AND links IS NOT NULL"
-        params.append(card_type.upper())
-    else:
-        query = f"SELECT * FROM cards WHERE ({category_filter}) AND links != '' AND links IS NOT NULL"
-
-    pool = c.execute(query, params).fetchall()
-    conn.close()
-
-    # Filter out URs with LR versions
-    lr_names = set()
-    for card in pool:
-        if card["rarity"] == "LR" and card["name"]:
-            lr_names.add(card["name"].strip().lower())
-
-    pool = [
-        card for card in pool
-        if not (card["rarity"] == "UR" and card["name"] and card["name"].strip().lower() in lr_names)
-    ]
+    # Find all cards in those categories, then build the team
+    pool = await result_cache.run("pool", (tuple(categories), card_type), get_category_pool, categories, card_type)
 
     if len(pool) < 2:
         return await interaction.followup.send(
@@ -781,16 +1828,19 @@ async def team_builder(interaction: discord.Interaction, leader: str, card_type:
         )
 
     # Build the team
-    team, honorable = build_best_team(leader_card, pool)
+    if mode == "optimal":
+        team, honorable, total, gap = await result_cache.run(
+            "team_optimal", (leader_card["id"], card_type), build_optimal_team, leader_card, pool
+        )
+    else:
+        team, honorable = await result_cache.run("team", (leader_card["id"], card_type), build_best_team, leader_card, pool)
 
     # Calculate full team link coverage
     all_links = []
     for member in [leader_card] + list(team):
-        if member["links"]:
-            for l in member["links"].replace("|", " - ").split(" - "):
-                l = l.strip()
-                if l and l not in all_links:
-                    all_links.append(l)
+        for l in catalog.links_of(member):
+            if l not in all_links:
+                all_links.append(l)
 
     # Build embed
     color = TYPE_COLORS.get(leader_type, discord.Color.blurple())
@@ -817,8 +1867,8 @@ async def team_builder(interaction: discord.Interaction, leader: str, card_type:
         m_name   = member["name"] or ""
         m_type   = clean_type(member["type"] or "")
         m_rarity = get_rarity(member["rarity"] or "")
-        m_links  = [l.strip() for l in (member["links"] or "").replace("|", " - ").split(" - ") if l.strip()]
-        leader_links = [l.strip() for l in (leader_card["links"] or "").replace("|", " - ").split(" - ") if l.strip()]
+        m_links  = catalog.links_of(member)
+        leader_links = catalog.links_of(leader_card)
         shared_with_leader = [l for l in m_links if l in leader_links]
 
         mt_emoji = TYPE_EMOJIS.get(m_type, "⚪")
@@ -852,9 +1902,76 @@ async def team_builder(interaction: discord.Interaction, leader: str, card_type:
                 inline=True
             )
 
-    embed.set_footer(text=f"Team built from {len(pool)} eligible cards • Dokkan Battle Wiki")
+    footer = f"Team built from {len(pool)} eligible cards"
+    if mode == "optimal":
+        footer += f" • {total} shared links • " + ("proven optimal" if gap == 0 else f"optimality gap ≤ {gap} links")
+    embed.set_footer(text=footer + " • Dokkan Battle Wiki")
+    await interaction.followup.send(embed=embed)
+
+# ======================
+# /leaders
+# ======================
+def best_leaders(category: str, limit: int = 10):
+    """Best leaders for a category by total HP/ATK/DEF boost, then Ki, as (card, leader skill row).
+
+    One range scan of idx_leader_target; a card's base and EZA rows collapse to the better one.
+    Returns None on a DB that hasn't been synced since leader skills were parsed.
+    """
+    with db.read() as conn:
+        try:
+            rows = conn.execute("""
+                SELECT ls.card_id, ls.eza, ls.ki, ls.hp_pct, ls.atk_pct, ls.def_pct, MAX(ls.stat_total) AS stat_total
+                FROM leader_skills ls
+                JOIN cards c ON c.id = ls.card_id
+                WHERE ls.kind = 'category' AND ls.target = ? AND c.is_superseded = 0
+                GROUP BY ls.card_id
+                ORDER BY stat_total DESC, ls.ki DESC, ls.card_id
+                LIMIT ?
+            """, (category.strip(), limit)).fetchall()
+        except sqlite3.OperationalError:
+            return None
+    return [(catalog.by_id[row["card_id"]], row) for row in rows if row["card_id"] in catalog.by_id]
+
+@bot.tree.command(name="leaders", description="Find the strongest leaders for a category")
+@app_commands.describe(category="Category name (e.g. Pure Saiyans, Androids)")
+async def leaders_lookup(interaction: discord.Interaction, category: str):
+    await interaction.response.defer()
+
+    if not db_exists():
+        return await interaction.followup.send("❌ Database is empty! Run `python sync.py` first.", ephemeral=True)
+
+    leaders = await result_cache.run("leaders", (category,), best_leaders, category)
+    if leaders is None:
+        return await interaction.followup.send("❌ Leader rankings need a fresh sync — run `python sync.py --update` first.", ephemeral=True)
+    if not leaders:
+        return await interaction.followup.send(f"❌ No leaders found for the **{category}** category.", ephemeral=True)
+
+    embed = discord.Embed(
+        title=f"👑 Best Leaders — {category}",
+        description="Ranked by total HP/ATK/DEF boost, then Ki.",
+        color=discord.Color.gold()
+    )
+    for i, (card, skill) in enumerate(leaders, 1):
+        display = card["title"] or card["page_title"]
+        r_emoji = RARITY_EMOJIS.get(get_rarity(card["rarity"] or ""), "⭐")
+        t_emoji = TYPE_EMOJIS.get(clean_type(card["type"] or ""), "⚪")
+        boosts = f"Ki +{skill['ki']} • HP +{skill['hp_pct']}% • ATK +{skill['atk_pct']}% • DEF +{skill['def_pct']}%"
+        embed.add_field(
+            name=f"{i}. {r_emoji} {t_emoji} {display}" + (" *(EZA)*" if skill["eza"] else ""),
+            value=f"{boosts}\n[View on Wiki]({card['wiki_url']})",
+            inline=False
+        )
+    embed.set_footer(text="Use /team with a leader to build around it • Dokkan Battle Wiki")
     await interaction.followup.send(embed=embed)
 
+@leaders_lookup.autocomplete("category")
+async def leaders_category_autocomplete(interaction: discord.Interaction, current: str):
+    needle = current.lower()
+    return [
+        app_commands.Choice(name=name[:100], value=name[:100])
+        for name in catalog.category_names if needle in name.lower()
+    ][:25]
+
 # ======================
 # COMMUNITY TEAM HELPERS
 # ======================
@@ -873,6 +1990,33 @@ def can_delete(interaction: discord.Interaction, submission_user_id: str) -> boo
             return True
     return False
 
+def insert_community_team(values: tuple, pages: list) -> int:
+    """Store a /submitteam submission with its resolved slot page titles and return its id"""
+    with db.write() as conn:
+        event_id = community_event_id(conn, values[4])
+        cursor = conn.execute(f"""
+            INSERT INTO community_teams
+            (user_id, username, server_id, server_name, event, stage, leader, card2, card3, card4, card5, card6, friend_unit, description,
+             {", ".join(f"{col}_page" for col in SLOT_COLUMNS)}, slots_resolved_sync, event_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {", ".join("?" for _ in SLOT_COLUMNS)}, ?, ?)
+        """, (*values, *pages, catalog.last_sync, event_id))
+        return cursor.lastrowid
+
+def build_team_lines(slots: list, pages: list) -> list:
+    """One "label rarity [title](url)" line per submitted slot (friend unit last), for the confirmation embeds"""
+    team_lines = []
+    labels = ["👑 Leader", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "🤝 Friend:"]
+    for label, slot, page in zip(labels, slots, pages):
+        if not slot:
+            continue
+        card = catalog.get(page) if page else None
+        if card:
+            r_emoji = RARITY_EMOJIS.get(get_rarity(card["rarity"] or ""), "⭐") if card["rarity"] else "⭐"
+            team_lines.append(f"{label} {r_emoji} [{card['title'] or card['name']}]({card['wiki_url']})")
+        else:
+            team_lines.append(f"{label} {slot}")
+    return team_lines
+
 # ======================
 # /submitteam
 # ======================
@@ -904,13 +2048,11 @@ async def submit_team(
 ):
     await interaction.response.defer(ephemeral=True)
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO community_teams
-        (user_id, username, server_id, server_name, event, stage, leader, card2, card3, card4, card5, card6, friend_unit, description)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+    # Resolve each slot to a card once, so browsing never has to search again
+    slots = [leader, card2, card3, card4, card5, card6, friend_unit]
+    pages = await db.run(resolve_slot_pages, slots)
+
+    sub_id = await db.run(insert_community_team, (
         str(interaction.user.id),
         str(interaction.user),
         str(interaction.guild.id) if interaction.guild else None,
@@ -920,30 +2062,9 @@ async def submit_team(
         leader, card2, card3, card4, card5, card6,
         friend_unit,
         description
-    ))
-    sub_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-
-    # Look up card URLs for confirmation
-    slots = [leader, card2, card3, card4, card5, card6]
-    team_lines = []
-    labels = ["👑 Leader", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣"]
-    for label, slot in zip(labels, slots):
-        url, found_title, rarity = find_card_url(slot)
-        r_emoji = RARITY_EMOJIS.get(get_rarity(rarity or ""), "⭐") if rarity else "⭐"
-        if url:
-            team_lines.append(f"{label} {r_emoji} [{found_title}]({url})")
-        else:
-            team_lines.append(f"{label} {slot}")
+    ), pages)
 
-    if friend_unit:
-        url, found_title, rarity = find_card_url(friend_unit)
-        r_emoji = RARITY_EMOJIS.get(get_rarity(rarity or ""), "⭐") if rarity else "⭐"
-        if url:
-            team_lines.append(f"🤝 Friend: {r_emoji} [{found_title}]({url})")
-        else:
-            team_lines.append(f"🤝 Friend: {friend_unit}")
+    team_lines = build_team_lines(slots, pages)
 
     event_display = f"**{event}**" + (f" — *{stage}*" if stage else "")
     embed = discord.Embed(
@@ -989,42 +2110,112 @@ async def event_autocomplete(interaction: discord.Interaction, current: str):
         print(f"Event autocomplete error: {e}")
         return []
 
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+class SlotAutocomplete:
+    """Word-prefix autocomplete for the /submitteam card slots.
+
+    Every word of each card's title and name sits in one sorted list, so finding the
+    cards for a prefix is two bisects. Each user's recent queries are kept in a small
+    LRU with their full candidate lists — when "gok" becomes "goku", the cached "gok"
+    candidates are narrowed instead of searching the whole catalog again.
+    """
+
+    def __init__(self, max_users: int = 1000, per_user: int = 8):
+        self.max_users = max_users
+        self.per_user = per_user
+        self.state = SimpleNamespace(
+            cards=[],            # the catalog positions below point into
+            words=[],            # sorted words, parallel to word_cards
+            word_cards=[],       # catalog position for each entry in words
+            card_words={},       # catalog position -> words in its title and name
+            recent=OrderedDict(),
+        )
+
+    def rebuild(self):
+        # Hide URs that have an LR of the same character, like the other card searches
+        cards, superseded = catalog.cards, catalog.superseded
+        entries = []
+        card_words = {}
+        for pos, card in enumerate(cards):
+            if not (card["title"] or card["name"]):
+                continue
+            if pos in superseded:
+                continue
+            words = tuple(set(WORD_RE.findall(f"{card['title'] or ''} {card['name'] or ''}".lower())))
+            card_words[pos] = words
+            entries.extend((word, pos) for word in words)
+        entries.sort()
+        self.state = SimpleNamespace(
+            cards=cards,
+            words=[word for word, _ in entries],
+            word_cards=[pos for _, pos in entries],
+            card_words=card_words,
+            recent=OrderedDict(),   # cached candidates are positions, so they go with the rest
+        )
+
+    @staticmethod
+    def _lookup(state, words: list) -> list:
+        """Full search — cards with a word starting with each query word, in rarity order"""
+        matched = None
+        for word in sorted(words, key=len, reverse=True):  # longest prefix is usually the rarest
+            lo = bisect_left(state.words, word)
+            hi = bisect_left(state.words, word + "\uffff", lo)
+            found = set(state.word_cards[lo:hi])
+            matched = found if matched is None else matched & found
+            if not matched:
+                return []
+        return sorted(matched)
+
+    @staticmethod
+    def _narrow(state, candidates: list, words: list) -> list:
+        return [
+            pos for pos in candidates
+            if all(any(w.startswith(word) for w in state.card_words[pos]) for word in words)
+        ]
+
+    def candidates(self, user_id: int, query: str, limit: int = 25) -> list:
+        """First `limit` cards matching `query`, reusing this user's earlier prefixes"""
+        state = self.state
+        query = query.lower()
+        words = WORD_RE.findall(query)
+        if not words:
+            return []
+
+        recent = state.recent
+        history = recent.get(user_id)
+        if history is None:
+            history = recent[user_id] = OrderedDict()
+            if len(recent) > self.max_users:
+                recent.popitem(last=False)
+        else:
+            recent.move_to_end(user_id)
+
+        if query in history:
+            history.move_to_end(query)
+            result = history[query]
+        else:
+            # Any cached query this one extends already holds a superset of the answer
+            base = max((q for q in history if query.startswith(q)), key=len, default=None)
+            result = self._narrow(state, history[base], words) if base is not None else self._lookup(state, words)
+            history[query] = result
+            if len(history) > self.per_user:
+                history.popitem(last=False)
+        return [state.cards[pos] for pos in result[:limit]]
+
+slot_autocomplete = SlotAutocomplete()
+catalog.indexes.append(slot_autocomplete)
+
 async def card_slot_autocomplete(interaction: discord.Interaction, current: str):
-    """Shared autocomplete for all card slots — searches DB by title"""
+    """Shared autocomplete for all card slots — prefix search over card titles and names"""
     if len(current) < 2:
         return []
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        like = f"%{current}%"
-        results = conn.execute("""
-            SELECT title, name, rarity FROM cards
-            WHERE title LIKE ? OR name LIKE ?
-            ORDER BY CASE rarity
-                WHEN 'LR' THEN 1 WHEN 'UR' THEN 2 WHEN 'SSR' THEN 3 ELSE 4
-            END
-            LIMIT 50
-        """, (like, like)).fetchall()
-        conn.close()
-
-        # Filter out URs that have LR versions
-        lr_names = set()
-        for r in results:
-            if r["rarity"] == "LR" and r["name"]:
-                lr_names.add(r["name"].strip().lower())
-
         choices = []
-        for r in results:
-            if r["rarity"] == "UR" and r["name"] and r["name"].strip().lower() in lr_names:
-                continue
-            title = r["title"] or r["name"] or ""
-            if not title:
-                continue
-            label = f"[{r['rarity']}] {title}"[:100]
+        for card in slot_autocomplete.candidates(interaction.user.id, current):
+            title = card["title"] or card["name"]
+            label = f"[{card['rarity']}] {title}"[:100]
             choices.append(app_commands.Choice(name=label, value=title))
-            if len(choices) >= 25:
-                break
-
         return choices
     except Exception as e:
         print(f"Autocomplete error: {e}")
@@ -1076,23 +2267,31 @@ def build_community_embed(rows, page, total_pages, total, event):
     embed.set_footer(text=f"Page {page}/{total_pages}  •  Submit your team with the button below!")
     return embed
 
-def get_community_rows(event, page, per_page=3):
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    offset = (page - 1) * per_page
-    if event:
-        total = conn.execute("SELECT COUNT(*) FROM community_teams WHERE event LIKE ?", (f"%{event}%",)).fetchone()[0]
-        rows = conn.execute("""
-            SELECT * FROM community_teams WHERE event LIKE ?
-            ORDER BY submitted_at DESC LIMIT ? OFFSET ?
-        """, (f"%{event}%", per_page, offset)).fetchall()
-    else:
-        total = conn.execute("SELECT COUNT(*) FROM community_teams").fetchone()[0]
-        rows = conn.execute("""
-            SELECT * FROM community_teams
-            ORDER BY submitted_at DESC LIMIT ? OFFSET ?
-        """, (per_page, offset)).fetchall()
-    conn.close()
+COMMUNITY_PER_PAGE = 3
+
+def get_community_rows(event, cursor=None, per_page=COMMUNITY_PER_PAGE):
+    """One page of submissions, newest first, starting after `cursor` — the (submitted_at, id) of
+    the previous page's last row. Returns (rows, total) with the total read from the counts table."""
+    with db.read() as conn:
+        where, params = [], []
+        if event:
+            # Exact event name (what autocomplete sends), else any event containing the text
+            events = conn.execute("SELECT id, team_count FROM community_events WHERE name = ?", (event,)).fetchall() \
+                  or conn.execute("SELECT id, team_count FROM community_events WHERE name LIKE ?", (f"%{event}%",)).fetchall()
+            if not events:
+                return [], 0
+            total = sum(e["team_count"] for e in events)
+            where.append(f"event_id IN ({', '.join('?' for _ in events)})")
+            params += [e["id"] for e in events]
+        else:
+            total = conn.execute("SELECT COALESCE(SUM(team_count), 0) FROM community_events").fetchone()[0]
+        if cursor:
+            where.append("(submitted_at, id) < (?, ?)")
+            params += cursor
+        rows = conn.execute(f"""
+            SELECT * FROM community_teams {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY submitted_at DESC, id DESC LIMIT ?
+        """, (*params, per_page)).fetchall()
     return rows, total
 
 class SubmitTeamModal(discord.ui.Modal, title="Submit a Community Team"):
@@ -1107,44 +2306,52 @@ class SubmitTeamModal(discord.ui.Modal, title="Submit a Community Team"):
             ephemeral=True
         )
 
+def community_pages(total: int) -> int:
+    return max(1, -(-total // COMMUNITY_PER_PAGE))
+
 class CommunityTeamsView(discord.ui.View):
-    def __init__(self, page, total_pages, event):
+    def __init__(self, rows, total, event):
         super().__init__(timeout=120)
-        self.page = page
-        self.total_pages = total_pages
         self.event = event
+        # Keyset cursors: cursors[i] is where page i + 1 starts (None for the first page)
+        self.cursors = [None]
+        self.last = (rows[-1]["submitted_at"], rows[-1]["id"]) if rows else None
+        self.update_buttons(total)
 
-        if page <= 1:
-            self.prev_button.disabled = True
-        if page >= total_pages:
-            self.next_button.disabled = True
+    @property
+    def page(self):
+        return len(self.cursors)
 
-    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
-    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.page -= 1
-        rows, total = get_community_rows(self.event, self.page)
-        self.total_pages = max(1, (total + 2) // 3)
+    def update_buttons(self, total):
+        self.total_pages = community_pages(total)
         self.prev_button.disabled = self.page <= 1
         self.next_button.disabled = self.page >= self.total_pages
-        embed = build_community_embed(rows, self.page, self.total_pages, total, self.event)
+
+    async def show(self, interaction: discord.Interaction):
+        rows, total = await db.run(get_community_rows, self.event, self.cursors[-1])
+        if rows:
+            self.last = (rows[-1]["submitted_at"], rows[-1]["id"])
+        self.update_buttons(total)
+        embed = await db.run(build_community_embed, rows, self.page, self.total_pages, total, self.event)
         await interaction.response.edit_message(embed=embed, view=self)
 
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if len(self.cursors) > 1:
+            self.cursors.pop()
+        await self.show(interaction)
+
     @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
     async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.page += 1
-        rows, total = get_community_rows(self.event, self.page)
-        self.total_pages = max(1, (total + 2) // 3)
-        self.prev_button.disabled = self.page <= 1
-        self.next_button.disabled = self.page >= self.total_pages
-        embed = build_community_embed(rows, self.page, self.total_pages, total, self.event)
-        await interaction.response.edit_message(embed=embed, view=self)
+        self.cursors.append(self.last)
+        await self.show(interaction)
 
 @bot.tree.command(name="communityteams", description="Browse community submitted teams for challenge events")
 @app_commands.describe(event="Filter by challenge event")
 async def community_teams(interaction: discord.Interaction, event: str = None):
     await interaction.response.defer()
 
-    rows, total = get_community_rows(event, 1)
+    rows, total = await db.run(get_community_rows, event)
 
     if not rows:
         return await interaction.followup.send(
@@ -1152,9 +2359,8 @@ async def community_teams(interaction: discord.Interaction, event: str = None):
             ephemeral=True
         )
 
-    total_pages = max(1, (total + 2) // 3)
-    embed = build_community_embed(rows, 1, total_pages, total, event)
-    view = CommunityTeamsView(1, total_pages, event)
+    embed = await db.run(build_community_embed, rows, 1, community_pages(total), total, event)
+    view = CommunityTeamsView(rows, total, event)
     await interaction.followup.send(embed=embed, view=view)
 
 @community_teams.autocomplete("event")
@@ -1168,6 +2374,14 @@ async def community_event_autocomplete(interaction: discord.Interaction, current
 # ======================
 # /deleteteam
 # ======================
+def get_community_team(team_id: int):
+    with db.read() as conn:
+        return conn.execute("SELECT * FROM community_teams WHERE id = ?", (team_id,)).fetchone()
+
+def delete_community_team(team_id: int):
+    with db.write() as conn:
+        conn.execute("DELETE FROM community_teams WHERE id = ?", (team_id,))
+
 @bot.tree.command(name="deleteteam", description="Delete a community team submission")
 @app_commands.describe(
     id="The submission ID to delete (e.g. 0042)",
@@ -1176,16 +2390,12 @@ async def community_event_autocomplete(interaction: discord.Interaction, current
 async def delete_team(interaction: discord.Interaction, id: int, reason: str = None):
     await interaction.response.defer(ephemeral=True)
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    row = conn.execute("SELECT * FROM community_teams WHERE id = ?", (id,)).fetchone()
+    row = await db.run(get_community_team, id)
 
     if not row:
-        conn.close()
         return await interaction.followup.send(f"❌ No submission found with ID `#{id:04d}`.", ephemeral=True)
 
     if not can_delete(interaction, row["user_id"]):
-        conn.close()
         return await interaction.followup.send(
             "❌ You can only delete your own submissions. Mods with the `Dokkan Mod` role can delete any submission.",
             ephemeral=True
@@ -1194,15 +2404,12 @@ async def delete_team(interaction: discord.Interaction, id: int, reason: str = N
     # If mod/admin is deleting someone else's team, require a reason
     is_own = str(interaction.user.id) == row["user_id"]
     if not is_own and not reason:
-        conn.close()
         return await interaction.followup.send(
             "❌ You must provide a **reason** when deleting someone else's team.\nUsage: `/deleteteam id:{} reason:Your reason here`".format(id),
             ephemeral=True
         )
 
-    conn.execute("DELETE FROM community_teams WHERE id = ?", (id,))
-    conn.commit()
-    conn.close()
+    await db.run(delete_community_team, id)
 
     await interaction.followup.send(
         f"✅ Submission `#{id:04d}` (**{row['event']}** by {row['username']}) has been deleted.",
@@ -1231,38 +2438,29 @@ def truncate(text: str, length: int = 40) -> str:
 
 def build_team_fields(embed, row, show_footer=True):
     """Add team cards as individual fields to embed, each card on its own line as a link"""
-    slots  = [row["leader"], row["card2"], row["card3"], row["card4"], row["card5"], row["card6"]]
     labels = ["👑", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣"]
     leader_image = None
 
-    for i, (label, slot) in enumerate(zip(labels, slots)):
+    # Slots are stored as page titles, so each card is a catalog lookup rather than a search
+    for i, (label, col) in enumerate(zip(labels, SLOT_COLUMNS)):
+        slot = row[col]
         if not slot:
             continue
-        url, found_title, rarity = find_card_url(slot)
-        r_emoji = RARITY_EMOJIS.get(get_rarity(rarity or ""), "⭐") if rarity else "⭐"
-
-        conn2 = sqlite3.connect(DB_PATH)
-        conn2.row_factory = sqlite3.Row
-        like = f"%{slot}%"
-        card_row = conn2.execute(
-            "SELECT type, image FROM cards WHERE name LIKE ? OR title LIKE ? ORDER BY CASE rarity WHEN 'LR' THEN 1 WHEN 'UR' THEN 2 ELSE 3 END LIMIT 1",
-            (like, like)
-        ).fetchone()
-        conn2.close()
-
+        card_row = slot_card(row, col)
+        r_emoji = RARITY_EMOJIS.get(get_rarity(card_row["rarity"] or ""), "⭐") if card_row and card_row["rarity"] else "⭐"
         t_emoji = TYPE_EMOJIS.get(clean_type(card_row["type"] or ""), "") if card_row else ""
         if i == 0 and card_row and card_row["image"]:
             leader_image = card_row["image"]
 
-        short_title = truncate(found_title or slot, 45)
-        value = f"[{short_title}]({url})" if url else short_title
+        short_title = truncate((card_row["title"] or card_row["name"]) if card_row else slot, 45)
+        value = f"[{short_title}]({card_row['wiki_url']})" if card_row else short_title
         embed.add_field(name=f"{label} {r_emoji} {t_emoji}", value=value, inline=True)
 
     if row["friend_unit"]:
-        url, found_title, rarity = find_card_url(row["friend_unit"])
-        r_emoji = RARITY_EMOJIS.get(get_rarity(rarity or ""), "⭐") if rarity else "⭐"
-        short_title = truncate(found_title or row["friend_unit"], 45)
-        value = f"[{short_title}]({url})" if url else short_title
+        card_row = slot_card(row, "friend_unit")
+        r_emoji = RARITY_EMOJIS.get(get_rarity(card_row["rarity"] or ""), "⭐") if card_row and card_row["rarity"] else "⭐"
+        short_title = truncate((card_row["title"] or card_row["name"]) if card_row else row["friend_unit"], 45)
+        value = f"[{short_title}]({card_row['wiki_url']})" if card_row else short_title
         embed.add_field(name=f"🤝 {r_emoji}", value=value, inline=True)
 
     if row["description"]:
@@ -1280,24 +2478,14 @@ def build_team_fields(embed, row, show_footer=True):
 # ======================
 # /myteams
 # ======================
-@bot.tree.command(name="myteams", description="View your own community team submissions")
-async def my_teams(interaction: discord.Interaction):
-    await interaction.response.defer(ephemeral=True)
-
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute("""
-        SELECT * FROM community_teams WHERE user_id = ?
-        ORDER BY submitted_at DESC LIMIT 10
-    """, (str(interaction.user.id),)).fetchall()
-    conn.close()
-
-    if not rows:
-        return await interaction.followup.send(
-            "❌ You haven't submitted any teams yet! Use `/submitteam` to get started.",
-            ephemeral=True
-        )
-
+def get_user_teams(user_id: str) -> list:
+    with db.read() as conn:
+        return conn.execute("""
+            SELECT * FROM community_teams WHERE user_id = ?
+            ORDER BY submitted_at DESC, id DESC LIMIT 10
+        """, (user_id,)).fetchall()
+
+def build_my_teams_embed(rows) -> discord.Embed:
     embed = discord.Embed(
         title="📋 Your Team Submissions",
         description=f"{len(rows)} submission(s)",
@@ -1313,11 +2501,51 @@ async def my_teams(interaction: discord.Interaction):
             embed.set_thumbnail(url=leader_image)
 
     embed.set_footer(text="Only you can see this • Use /deleteteam to remove a submission")
+    return embed
+
+@bot.tree.command(name="myteams", description="View your own community team submissions")
+async def my_teams(interaction: discord.Interaction):
+    await interaction.response.defer(ephemeral=True)
+
+    rows = await db.run(get_user_teams, str(interaction.user.id))
+
+    if not rows:
+        return await interaction.followup.send(
+            "❌ You haven't submitted any teams yet! Use `/submitteam` to get started.",
+            ephemeral=True
+        )
+
+    embed = await db.run(build_my_teams_embed, rows)
     await interaction.followup.send(embed=embed, ephemeral=True)
 
 # ======================
 # /upcoming
 # ======================
+def get_schedule_page(filter, page, per_page):
+    """(total, rows, count, synced_at) for one /upcoming page — total is None if there's no schedule table"""
+    offset = (page - 1) * per_page
+    with db.read() as conn:
+        try:
+            total = conn.execute("SELECT COUNT(*) FROM schedule").fetchone()[0]
+        except sqlite3.OperationalError:
+            return None, [], 0, None
+        if total == 0:
+            return total, [], 0, None
+
+        if filter:
+            f = filter.upper()
+            rows = conn.execute("""
+                SELECT * FROM schedule WHERE type = ? OR rarity = ?
+                LIMIT ? OFFSET ?
+            """, (f, f, per_page, offset)).fetchall()
+            count = conn.execute("SELECT COUNT(*) FROM schedule WHERE type = ? OR rarity = ?", (f, f)).fetchone()[0]
+        else:
+            rows = conn.execute("SELECT * FROM schedule LIMIT ? OFFSET ?", (per_page, offset)).fetchall()
+            count = total
+
+        synced_at = conn.execute("SELECT synced_at FROM schedule ORDER BY id DESC LIMIT 1").fetchone()
+    return total, rows, count, synced_at
+
 @bot.tree.command(name="upcoming", description="Show upcoming cards scheduled to release in Dokkan Battle")
 @app_commands.describe(
     filter="Filter by type or rarity (optional)",
@@ -1326,43 +2554,22 @@ async def my_teams(interaction: discord.Interaction):
 async def upcoming_cards(interaction: discord.Interaction, filter: str = None, page: int = 1):
     await interaction.response.defer()
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    per_page = 8
+    total, rows, count, synced_at = await db.run(get_schedule_page, filter, page, per_page)
 
     # Check if schedule table exists and has data
-    try:
-        total = conn.execute("SELECT COUNT(*) FROM schedule").fetchone()[0]
-    except Exception:
-        conn.close()
+    if total is None:
         return await interaction.followup.send(
             "❌ Schedule table not found. Run `python sync.py` to populate it.",
             ephemeral=True
         )
 
     if total == 0:
-        conn.close()
         return await interaction.followup.send(
             "❌ No upcoming cards found. Run `python sync.py` to sync the schedule.",
             ephemeral=True
         )
 
-    per_page = 8
-    offset = (page - 1) * per_page
-
-    if filter:
-        f = filter.upper()
-        rows = conn.execute("""
-            SELECT * FROM schedule WHERE type = ? OR rarity = ?
-            LIMIT ? OFFSET ?
-        """, (f, f, per_page, offset)).fetchall()
-        count = conn.execute("SELECT COUNT(*) FROM schedule WHERE type = ? OR rarity = ?", (f, f)).fetchone()[0]
-    else:
-        rows = conn.execute("SELECT * FROM schedule LIMIT ? OFFSET ?", (per_page, offset)).fetchall()
-        count = total
-
-    synced_at = conn.execute("SELECT synced_at FROM schedule ORDER BY id DESC LIMIT 1").fetchone()
-    conn.close()
-
     if not rows:
         return await interaction.followup.send(
             f"❌ No upcoming cards found{f' for **{filter}**' if filter else ''}.",
@@ -1406,30 +2613,7 @@ async def upcoming_cards(interaction: discord.Interaction, filter: str = None, p
 # ======================
 # /ezainfo
 # ======================
-@bot.tree.command(name="ezainfo", description="Look up a card's Extreme Z-Awakening info")
-@app_commands.describe(
-    name="Card name to look up EZA info for",
-    card_type="Filter by type (optional)",
-)
-@app_commands.choices(card_type=[
-    app_commands.Choice(name="🔵 AGL", value="AGL"),
-    app_commands.Choice(name="🟢 TEQ", value="TEQ"),
-    app_commands.Choice(name="🟣 INT", value="INT"),
-    app_commands.Choice(name="🔴 STR", value="STR"),
-    app_commands.Choice(name="🟠 PHY", value="PHY"),
-])
-async def eza_info(interaction: discord.Interaction, name: str, card_type: str = None):
-    await interaction.response.defer()
-
-    if not db_exists():
-        return await interaction.followup.send("❌ Database is empty! Run `python sync.py` first.", ephemeral=True)
-
-    results = db_search(name, card_type=card_type, limit=5)
-    if not results:
-        return await interaction.followup.send(f"❌ No card found for **{name}**.", ephemeral=True)
-
-    card = results[0]
-
+def build_eza_embed(card):
     # Check if EZA data exists
     has_eza = any([
         card["eza_leader_skill"], card["eza_super_attack"],
@@ -1453,7 +2637,7 @@ async def eza_info(interaction: discord.Interaction, name: str, card_type: str =
         if card["image"]:
             embed.set_thumbnail(url=card["image"])
         embed.set_footer(text="Dokkan Battle Wiki")
-        return await interaction.followup.send(embed=embed)
+        return embed
 
     embed = discord.Embed(
         title=f"⚡ {title}",
@@ -1499,7 +2683,32 @@ async def eza_info(interaction: discord.Interaction, name: str, card_type: str =
         embed.add_field(name="✨ EZA Passive Skill", value=ps, inline=False)
 
     embed.set_footer(text="Dokkan Battle Wiki • Click the title to view full card page")
-    await interaction.followup.send(embed=embed)
+    return embed
+
+@bot.tree.command(name="ezainfo", description="Look up a card's Extreme Z-Awakening info")
+@app_commands.describe(
+    name="Card name to look up EZA info for",
+    card_type="Filter by type (optional)",
+)
+@app_commands.choices(card_type=[
+    app_commands.Choice(name="🔵 AGL", value="AGL"),
+    app_commands.Choice(name="🟢 TEQ", value="TEQ"),
+    app_commands.Choice(name="🟣 INT", value="INT"),
+    app_commands.Choice(name="🔴 STR", value="STR"),
+    app_commands.Choice(name="🟠 PHY", value="PHY"),
+])
+async def eza_info(interaction: discord.Interaction, name: str, card_type: str = None):
+    await interaction.response.defer()
+
+    if not db_exists():
+        return await interaction.followup.send("❌ Database is empty! Run `python sync.py` first.", ephemeral=True)
+
+    results = await result_cache.run("search", (name, card_type, None, 5), db_search, name, card_type, None, 5)
+    if not results:
+        return await interaction.followup.send(f"❌ No card found for **{name}**." + did_you_mean(name), ephemeral=True)
+
+    card = results[0]
+    await interaction.followup.send(embed=render_cache.embed("eza", card, build_eza_embed))
 
 
 # ======================
@@ -1512,8 +2721,13 @@ SUMMON_RATES = [
     ("N",   0.15),
 ]
 
+SPECIAL_SUMMON_RATE = 0.10   # chance a summon is special, with a guaranteed LR first pull
+MULTI_PULLS  = 10
+MULTI_STONES = 50
+
 SUMMON_COLORS = {
     "LR":  discord.Color.from_rgb(255, 50, 50),
+    "UR":  discord.Color.orange(),
     "SSR": discord.Color.gold(),
     "SR":  discord.Color.purple(),
     "R":   discord.Color.blue(),
@@ -1522,6 +2736,7 @@ SUMMON_COLORS = {
 
 SUMMON_SPARKLE = {
     "LR":  "🌟",
+    "UR":  "🔥",
     "SSR": "✨",
     "SR":  "💜",
     "R":   "💙",
@@ -1541,24 +2756,234 @@ SPECIAL_ANIMATIONS = [
     "https://media.giphy.com/media/eJ1U3jkPwvnGTcTiRz/giphy.gif",
 ]
 
-def pull_card(conn, rarity: str):
-    conn.row_factory = sqlite3.Row
-    row = conn.execute("""
-        SELECT title, name, type, rarity, image, wiki_url FROM cards
-        WHERE rarity = ? AND title IS NOT NULL
-        ORDER BY RANDOM() LIMIT 1
-    """, (rarity,)).fetchone()
-    return row
-
-def weighted_rarity() -> str:
-    import random
-    roll = random.random()
-    cumulative = 0
-    for rarity, rate in SUMMON_RATES:
-        cumulative += rate
-        if roll <= cumulative:
-            return rarity
-    return "N"
+def init_banner_db():
+    """Create the summon banner tables if they don't exist.
+
+    Featured cards have their own per-pull rate; rate-up cards share the banner's
+    rateup_rate unless they set one. Whatever is left follows SUMMON_RATES over the
+    rest of the pool. Any change to a banner bumps its revision.
+
+    Banners are set up straight in SQL, e.g.
+
+        INSERT INTO banners (name, rateup_rate) VALUES ('Dokkan Festival', 0.06);
+        INSERT INTO banner_cards (banner_id, page_title, tier, rate)
+            VALUES (1, '<wiki page title>', 'featured', 0.01),
+                   (1, '<wiki page title>', 'rateup', NULL);   -- NULL: a share of rateup_rate
+
+    page_title is the card's wiki page, as stored in cards.page_title. Rate changes
+    apply on the next summon; new banner names show up in autocomplete once the
+    catalog reloads (restart or the next scheduled sync).
+    """
+    with db.write() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS banners (
+                id          INTEGER PRIMARY KEY,
+                name        TEXT NOT NULL UNIQUE COLLATE NOCASE,
+                rateup_rate REAL NOT NULL DEFAULT 0,
+                revision    INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS banner_cards (
+                banner_id  INTEGER NOT NULL REFERENCES banners(id),
+                page_title TEXT NOT NULL,
+                tier       TEXT NOT NULL CHECK (tier IN ('featured', 'rateup')),
+                rate       REAL CHECK (tier = 'rateup' OR rate IS NOT NULL),
+                PRIMARY KEY (banner_id, page_title)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS banner_cards_insert AFTER INSERT ON banner_cards BEGIN
+                UPDATE banners SET revision = revision + 1 WHERE id = new.banner_id;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS banner_cards_delete AFTER DELETE ON banner_cards BEGIN
+                UPDATE banners SET revision = revision + 1 WHERE id = old.banner_id;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS banner_cards_update AFTER UPDATE ON banner_cards BEGIN
+                UPDATE banners SET revision = revision + 1 WHERE id IN (old.banner_id, new.banner_id);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS banners_update AFTER UPDATE OF rateup_rate ON banners BEGIN
+                UPDATE banners SET revision = revision + 1 WHERE id = new.id;
+            END
+        """)
+
+class SummonTable:
+    """A per-card rate table compiled to Walker alias arrays.
+
+    Each pull is one uniform slot plus one coin flip against that slot's threshold,
+    whatever the pool size.
+    """
+
+    def __init__(self, key, name, state, positions: np.ndarray, rates: np.ndarray):
+        self.key = key              # (banner id, revision), or ("default",)
+        self.name = name
+        self.state = state          # the SummonPools state it was compiled from
+        self.positions = positions  # slot -> catalog position
+        self.probs = rates / rates.sum()
+
+        n = len(self.probs)
+        scaled = self.probs * n
+        threshold, alias = np.ones(n), np.arange(n)
+        small = [i for i in range(n) if scaled[i] < 1]
+        large = [i for i in range(n) if scaled[i] >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            threshold[s], alias[s] = scaled[s], l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+        self.threshold, self.alias = threshold, alias
+
+    def draw(self, rng, pulls: int) -> np.ndarray:
+        """Catalog positions of `pulls` independent draws"""
+        slots = rng.integers(len(self.threshold), size=pulls)
+        slots = np.where(rng.random(pulls) < self.threshold[slots], slots, self.alias[slots])
+        return self.positions[slots]
+
+    def chance(self, match) -> float:
+        """Per-pull chance of drawing a card for which match(card) is true"""
+        return float(sum(p for pos, p in zip(self.positions, self.probs) if match(self.state.cards[pos])))
+
+class SummonPools:
+    """Per-rarity card pools for /summon, as arrays of catalog positions.
+
+    Rebuilt when the catalog reloads. A roll draws every rarity for the summon in
+    one vectorized step, then one uniform index per pull into that rarity's pool.
+    Banner summons draw from a compiled SummonTable instead, cached until the banner
+    or the card set changes.
+    """
+
+    RARITIES = ("LR",) + tuple(rarity for rarity, _ in SUMMON_RATES)
+
+    def __init__(self):
+        self.state = SimpleNamespace(
+            cards=[],       # the catalog positions below point into
+            position={},    # card id -> catalog position
+            pools={rarity: np.array([], dtype=np.intp) for rarity in self.RARITIES},
+            tables={},      # (banner id, revision) or ("default",) -> SummonTable
+        )
+        self.lock = threading.Lock()   # tables are compiled on DB worker threads
+        self.banner_names = []
+        self.rng = np.random.default_rng()
+        self.rarities = np.array([rarity for rarity, _ in SUMMON_RATES])
+        self.cumulative = np.cumsum([rate for _, rate in SUMMON_RATES])
+
+    def rebuild(self):
+        cards = catalog.cards
+        self.state = SimpleNamespace(
+            cards=cards,
+            position=catalog.position,
+            pools={
+                rarity: np.array([p for p in catalog.by_rarity.get(rarity, ()) if cards[p]["title"] is not None],
+                                 dtype=np.intp)
+                for rarity in self.RARITIES
+            },
+            tables={},
+        )
+        self.load_banner_names()
+
+    def pull(self, rarities: np.ndarray, state=None) -> list:
+        """One uniformly drawn card (or None if the pool is empty) per rarity in `rarities`"""
+        state = state or self.state
+        cards = [None] * len(rarities)
+        for rarity in np.unique(rarities):
+            slots = np.flatnonzero(rarities == rarity)
+            pool = state.pools.get(str(rarity))
+            if pool is None or not len(pool):
+                continue
+            for slot, pos in zip(slots, pool[self.rng.integers(len(pool), size=len(slots))]):
+                cards[slot] = state.cards[pos]
+        return cards
+
+    def roll(self, pulls: int, is_special: bool, table: SummonTable = None) -> list:
+        """Roll a single or multi summon as a list of (rarity, card)"""
+        state = table.state if table else self.state
+        if table:
+            results = [(card["rarity"], card) for card in (state.cards[pos] for pos in table.draw(self.rng, pulls))]
+            if is_special and len(state.pools["LR"]):
+                results[0] = ("LR", self.pull(np.array(["LR"]), state)[0])
+            return results
+        # Same cumulative walk as a rate table lookup, for every pull at once
+        picks = np.searchsorted(self.cumulative, self.rng.random(pulls))
+        rarities = self.rarities[np.minimum(picks, len(self.rarities) - 1)]
+        if is_special and len(state.pools["LR"]):
+            # Guaranteed LR on first pull, rest are normal
+            rarities[0] = "LR"
+        return list(zip((str(r) for r in rarities), self.pull(rarities, state)))
+
+    def load_banner_names(self):
+        try:
+            with db.read() as conn:
+                self.banner_names = [row["name"] for row in conn.execute("SELECT name FROM banners ORDER BY name")]
+        except sqlite3.OperationalError:
+            self.banner_names = []   # no DB or no banner tables yet
+
+    def table(self, banner: str = None):
+        """Compiled SummonTable for a banner name (None for the standard rates).
+
+        None if there's no such banner, or no cards to draw.
+        """
+        state = self.state
+        if not banner:
+            with self.lock:
+                if ("default",) not in state.tables:
+                    rates = {}
+                    for rarity, rate in SUMMON_RATES:
+                        pool = state.pools[rarity]
+                        rates.update((pos, rate / len(pool)) for pos in pool)
+                    table = self._compile(("default",), None, state, rates)
+                    if table is None:
+                        return None
+                    state.tables[("default",)] = table
+                return state.tables[("default",)]
+
+        with db.read() as conn:
+            row = conn.execute("SELECT id, name, rateup_rate, revision FROM banners WHERE name = ?", (banner,)).fetchone()
+            if not row:
+                return None
+            key = (row["id"], row["revision"])
+            with self.lock:
+                if key in state.tables:
+                    return state.tables[key]
+            entries = conn.execute("SELECT page_title, tier, rate FROM banner_cards WHERE banner_id = ?", (row["id"],)).fetchall()
+
+        rates = {}
+        entries = [(state.position.get(card["id"]), e) for e in entries if (card := catalog.get(e["page_title"]))]
+        entries = [(pos, e) for pos, e in entries if pos is not None]
+        shared = sum(1 for _, e in entries if e["tier"] == "rateup" and e["rate"] is None)
+        for pos, e in entries:
+            if e["rate"] is not None:
+                rates[pos] = e["rate"]
+            elif e["tier"] == "rateup":
+                rates[pos] = row["rateup_rate"] / shared
+        rest = max(0.0, 1.0 - sum(rates.values()))
+        for rarity, rate in SUMMON_RATES:
+            pool = [pos for pos in state.pools[rarity] if pos not in rates]
+            rates.update((pos, rest * rate / len(pool)) for pos in pool)
+        with self.lock:
+            # Drop compiled tables for older revisions of this banner
+            for old in [k for k in state.tables if k[0] == row["id"]]:
+                del state.tables[old]
+            table = self._compile(key, row["name"], state, rates)
+            if table is not None:
+                state.tables[key] = table
+            return table
+
+    @staticmethod
+    def _compile(key, name, state, rates: dict):
+        """SummonTable for these per-card rates, or None if there's nothing to draw"""
+        if not any(rate > 0 for rate in rates.values()):
+            return None
+        return SummonTable(key, name, state, np.fromiter(rates.keys(), dtype=np.intp, count=len(rates)),
+                           np.fromiter(rates.values(), dtype=float, count=len(rates)))
+
+summon_pools = SummonPools()
+catalog.indexes.append(summon_pools)
 
 def build_single_result(rarity, card) -> discord.Embed:
     sparkle = SUMMON_SPARKLE[rarity]
@@ -1609,16 +3034,24 @@ def build_multi_result(results) -> discord.Embed:
     return embed
 
 @bot.tree.command(name="summon", description="Simulate a Dokkan Battle summon!")
-@app_commands.describe(type="Single pull or Multi (10 pulls)")
+@app_commands.describe(type="Single pull or Multi (10 pulls)", banner="Summon on a banner with featured units")
 @app_commands.choices(type=[
     app_commands.Choice(name="Single (1 pull)", value="single"),
     app_commands.Choice(name="Multi (10 pulls)", value="multi"),
 ])
-async def summon(interaction: discord.Interaction, type: str = "single"):
+async def summon(interaction: discord.Interaction, type: str = "single", banner: str = None):
     import random, asyncio
 
+    table = None
+    if banner:
+        if not db_exists():
+            return await interaction.response.send_message("❌ Database is empty! Run `python sync.py` first.", ephemeral=True)
+        table = await db.run(summon_pools.table, banner)
+        if not table:
+            return await interaction.response.send_message(f"❌ No banner named **{banner}**.", ephemeral=True)
+
     # 1 in 10 chance of special LR animation
-    is_special = random.random() < 0.10
+    is_special = random.random() < SPECIAL_SUMMON_RATE
 
     # Step 1: Show animation
     if is_special:
@@ -1639,25 +3072,8 @@ async def summon(interaction: discord.Interaction, type: str = "single"):
     await interaction.response.send_message(embed=loading_embed)
 
     # Step 2: Roll results
-    conn = sqlite3.connect(DB_PATH)
-    pulls = 1 if type == "single" else 10
-    results = []
-
-    if is_special:
-        # Guaranteed LR on first pull, rest are normal
-        lr_card = pull_card(conn, "LR")
-        if lr_card:
-            results.append(("LR", lr_card))
-        else:
-            results.append((weighted_rarity(), pull_card(conn, weighted_rarity())))
-        for _ in range(pulls - 1):
-            rarity = weighted_rarity()
-            results.append((rarity, pull_card(conn, rarity)))
-    else:
-        for _ in range(pulls):
-            rarity = weighted_rarity()
-            results.append((rarity, pull_card(conn, rarity)))
-    conn.close()
+    pulls = 1 if type == "single" else MULTI_PULLS
+    results = summon_pools.roll(pulls, is_special, table)
 
     # Step 3: Dramatic pause — longer for special
     await asyncio.sleep(3.5 if is_special else 2.5)
@@ -1672,9 +3088,151 @@ async def summon(interaction: discord.Interaction, type: str = "single"):
         if is_special:
             result_embed.title = "🌟 SPECIAL MULTI SUMMON!"
             result_embed.description = "⚡ **Guaranteed LR!**\n\n" + (result_embed.description or "")
+    if table:
+        result_embed.set_author(name=f"🎏 {table.name}")
 
     await interaction.edit_original_response(embed=result_embed)
 
+@summon.autocomplete("banner")
+async def summon_banner_autocomplete(interaction: discord.Interaction, current: str):
+    return [
+        app_commands.Choice(name=name, value=name)
+        for name in summon_pools.banner_names
+        if current.lower() in name.lower()
+    ][:25]
+
+# ======================
+# /summonstats
+# ======================
+SUMMONSTATS_TRIALS = 10000
+SUMMONSTATS_BUDGET = 20_000_000   # simulated multis, across all trials, before giving up
+SUMMONSTATS_PERCENTILES = (50, 75, 90, 99)
+
+def simulate_summons(pull_chance: float, special_chance: float, trials: int = SUMMONSTATS_TRIALS, seed=None) -> dict:
+    """Monte Carlo of multis until the first hit.
+
+    pull_chance is the per-pull chance of a hit; special_chance the chance the
+    guaranteed LR of a special summon is one. Each multi is a special flag plus one
+    draw against that kind of multi's hit chance, for every unfinished trial at once,
+    in blocks that double in length while trials remain.
+    """
+    rng = np.random.default_rng(seed)
+    if not pull_chance and not special_chance:
+        return {}
+    normal_hit = 1 - (1 - pull_chance) ** MULTI_PULLS
+    special_hit = 1 - (1 - pull_chance) ** (MULTI_PULLS - 1) * (1 - special_chance)
+    multis = np.full(trials, -1, dtype=np.int64)
+    pending = np.arange(trials)
+    done = simulated = 0
+    block = 16
+    while len(pending) and simulated < SUMMONSTATS_BUDGET:
+        shape = (len(pending), block)
+        special = rng.random(shape) < SPECIAL_SUMMON_RATE
+        hit = rng.random(shape) < np.where(special, special_hit, normal_hit)
+        found = hit.any(axis=1)
+        multis[pending[found]] = done + hit[found].argmax(axis=1) + 1
+        pending = pending[~found]
+        done += block
+        simulated += hit.size
+        block = min(block * 2, 1024)
+
+    # Trials still going count as taking forever: their percentiles come out as None
+    never = np.iinfo(np.int64).max
+    ranked = np.sort(np.where(multis > 0, multis, never))
+    percentiles = {}
+    for p in SUMMONSTATS_PERCENTILES:
+        value = ranked[min(trials - 1, int(np.ceil(p / 100 * trials)) - 1)]
+        percentiles[p] = None if value == never else int(value)
+    return {
+        "mean": float(multis.mean()) if not len(pending) else None,
+        "percentiles": percentiles,
+        "trials": trials,
+        "unfinished": int(len(pending)),
+        "limit": done,
+        "pulls": simulated * MULTI_PULLS,
+    }
+
+def summon_odds(table: SummonTable, rarity: str = None, card=None) -> tuple:
+    """(per-pull chance, simulate_summons stats) for pulling a rarity or a specific card"""
+    lr_pool = table.state.pools["LR"]
+    if card:
+        pos = table.state.position.get(card["id"])
+        pull_chance = table.chance(lambda c: c["id"] == card["id"])
+        special_chance = 1 / len(lr_pool) if pos in set(lr_pool.tolist()) else 0.0
+    else:
+        pull_chance = table.chance(lambda c: c["rarity"] == rarity)
+        special_chance = 1.0 if rarity == "LR" and len(lr_pool) else 0.0
+    return pull_chance, simulate_summons(pull_chance, special_chance)
+
+@bot.tree.command(name="summonstats", description="How many summons it takes to pull a rarity or a card")
+@app_commands.describe(
+    rarity="Rarity to pull",
+    card="A specific card to pull (overrides rarity)",
+    banner="Summon on a banner with featured units"
+)
+@app_commands.choices(rarity=[
+    app_commands.Choice(name=rarity, value=rarity) for rarity in ("LR", "UR", "SSR", "SR", "R", "N")
+])
+async def summon_stats(interaction: discord.Interaction, rarity: str = "SSR", card: str = None, banner: str = None):
+    await interaction.response.defer()
+
+    if not db_exists():
+        return await interaction.followup.send("❌ Database is empty! Run `python sync.py` first.", ephemeral=True)
+    table = await db.run(summon_pools.table, banner)
+    if not table:
+        return await interaction.followup.send(f"❌ No banner named **{banner}**.", ephemeral=True)
+    target = None
+    if card:
+        target = await db.run(resolve_card, card)
+        if not target:
+            return await interaction.followup.send(f"❌ No card found matching **{card}**.", ephemeral=True)
+
+    # Cached per rate configuration: the rate table, special rate and banner revision
+    rates = (tuple(SUMMON_RATES), SPECIAL_SUMMON_RATE, MULTI_PULLS, table.key)
+    pull_chance, stats = await result_cache.run(
+        "summonstats", (rates, target["id"] if target else rarity), summon_odds, table, rarity, target
+    )
+
+    label = f"{RARITY_EMOJIS.get(target['rarity'], '⭐')} {target['title'] or target['name']}" if target else f"{RARITY_EMOJIS.get(rarity, '⭐')} any {rarity}"
+    embed = discord.Embed(
+        title=f"📊 Summon Odds — {label}",
+        description=f"🎏 {table.name} banner" if table.name else "Standard summon rates",
+        color=discord.Color.gold()
+    )
+    if not stats:
+        embed.description += f"\n\n❌ This can't be pulled from {'this banner' if table.name else 'a normal summon'}."
+        return await interaction.followup.send(embed=embed)
+
+    embed.add_field(name="🎯 Per Pull", value=f"`{pull_chance:.3%}`", inline=True)
+    embed.add_field(
+        name="📈 Expected",
+        value=f"`{stats['mean']:,.1f}` multis • `{stats['mean'] * MULTI_STONES:,.0f}` stones"
+              if stats["mean"] is not None else f"More than `{stats['limit']:,}` multis",
+        inline=True
+    )
+    embed.add_field(
+        name="📉 Percentiles",
+        value="\n".join(
+            f"**{p}%** by `{m:,}` multis ({m * MULTI_STONES:,} stones)" if m is not None
+            else f"**{p}%** — not within `{stats['limit']:,}` multis"
+            for p, m in stats["percentiles"].items()
+        ),
+        inline=False
+    )
+    footer = f"{stats['trials']:,} simulated players • {stats['pulls']:,} pulls"
+    if stats["unfinished"]:
+        footer += f" • {stats['unfinished']:,} still going after {stats['limit']:,} multis"
+    embed.set_footer(text=footer)
+    await interaction.followup.send(embed=embed)
+
+@summon_stats.autocomplete("card")
+async def summon_stats_card_autocomplete(interaction: discord.Interaction, current: str):
+    return await card_slot_autocomplete(interaction, current)
+
+@summon_stats.autocomplete("banner")
+async def summon_stats_banner_autocomplete(interaction: discord.Interaction, current: str):
+    return await summon_banner_autocomplete(interaction, current)
+
 # ======================
 # /festgoat
 # ======================
@@ -1720,6 +3278,7 @@ async def help_command(interaction: discord.Interaction):
         value=(
             "`/card` — Search for a card by name\n"
             "`/cardurl` — Look up a card by its wiki URL\n"
+            "`/filter` — Find cards by stat range, sorted by any stat\n"
             "`/ezainfo` — View a card's EZA leader skill, super attack & passive\n"
             "`/upcoming` — See upcoming cards coming to the game"
         ),
@@ -1729,8 +3288,9 @@ async def help_command(interaction: discord.Interaction):
     embed.add_field(
         name="👥 Team Building",
         value=(
-            "`/team` — Auto-build a team around a leader card\n"
-            "`/links` — Find the best linking partners for a card"
+            "`/team` — Auto-build a team around a leader card (`mode: Optimal` for the best link overlap)\n"
+            "`/links` — Find the best linking partners for a card\n"
+            "`/leaders` — Rank the best leaders for a category"
         ),
         inline=False
     )
@@ -1749,7 +3309,8 @@ async def help_command(interaction: discord.Interaction):
     embed.add_field(
         name="🎲 Fun",
         value=(
-            "`/summon` — Simulate a Dokkan summon (single or multi)\n"
+            "`/summon` — Simulate a Dokkan summon (single or multi, optionally on a banner)\n"
+            "`/summonstats` — Expected summons to pull a rarity or a card\n"
             "`/festgoat` — Best Festival of Battles content on YouTube"
         ),
         inline=False
@@ -1832,4 +3393,5 @@ async def servers(interaction: discord.Interaction):
 # ======================
 # RUN
 # ======================
-bot.run(TOKEN)
+if __name__ == "__main__":
+    bot.run(TOKEN)
@@ -3,25 +3,60 @@ sync.py — Dokkan Battle card database sync script
 Run this once to populate the database, then schedule it daily.
 
 Usage:
-    python sync.py            # Full sync (all cards)
+    python sync.py            # Full sync (cards whose wiki page changed since the last sync)
     python sync.py --update   # Only sync cards added/changed recently
+    python sync.py --resync   # Re-sync cards whose wiki page changed (same as a full sync)
+    python sync.py --force    # Re-sync every card, changed or not
+    python sync.py --reparse  # Rebuild cards from the local wikitext cache (offline)
 """
 
 import aiohttp
 import asyncio
 import sqlite3
 import re
+import os
 import time
+import struct
+import zlib
+import hashlib
 import argparse
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+import numpy as np
 
 # ======================
 # CONFIG
 # ======================
 WIKI_API    = "https://dbz-dokkanbattle.fandom.com/api.php"
 DB_PATH     = "dokkan.db"
-BATCH_SIZE  = 50       # cards to fetch concurrently
-DELAY       = 0.3      # seconds between batches to avoid rate limits
+
+# Wiki fetcher — see WikiFetcher
+RATE_LIMIT      = 20.0   # requests per second (token bucket refill)
+RATE_BURST      = 20     # requests allowed back to back after an idle spell
+MIN_CONCURRENCY = 2      # requests in flight never drop below this...
+MAX_CONCURRENCY = 50     # ...or grow above this
+LATENCY_TARGET  = 3.0    # seconds — slower responses shrink concurrency
+MAX_RETRIES     = 4
+RETRY_BACKOFF   = 1.0    # seconds before the first retry, doubled each time
+PROGRESS_EVERY  = 5.0    # seconds between progress lines
+REVISION_BATCH  = 50     # titles per query+revisions request (the API's limit)
+FLUSH_SIZE  = 200      # parsed cards written per transaction
+
+# Card x card shared-link counts, written next to the DB for the bot to mmap
+SYNERGY_PATH    = "dokkan.synergy"
+SYNERGY_MAGIC   = b"DKSY"
+SYNERGY_VERSION = 1
+SYNERGY_HEADER  = struct.Struct("<4sIII")   # magic, version, card count, reserved
+# File layout: header, int64 card ids (ascending), then a uint8 count matrix in the same order
+
+# Raw wikitext of every fetched page revision, zlib-compressed and stored by content hash,
+# so --reparse can rebuild the cards offline after a parser change
+WIKITEXT_CACHE_PATH = "dokkan.wikitext"
+
+# Stat columns that also get an INTEGER "<col>_num" copy for filtering/sorting
+STAT_COLUMNS = ["base_hp", "base_atk", "base_def", "max_hp", "max_atk", "max_def",
+                "eza_max_hp", "eza_max_atk", "eza_max_def"]
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
@@ -64,16 +99,62 @@ def init_db():
             eza_passive_skill TEXT,
             eza_max_hp        TEXT,
             eza_max_atk       TEXT,
-            eza_max_def       TEXT
+            eza_max_def       TEXT,
+            card_family       TEXT,
+            is_superseded     INTEGER NOT NULL DEFAULT 0,
+            base_hp_num       INTEGER,
+            base_atk_num      INTEGER,
+            base_def_num      INTEGER,
+            max_hp_num        INTEGER,
+            max_atk_num       INTEGER,
+            max_def_num       INTEGER,
+            eza_max_hp_num    INTEGER,
+            eza_max_atk_num   INTEGER,
+            eza_max_def_num   INTEGER,
+            lastrevid         INTEGER,
+            touched           TEXT
         )
     """)
     # Add EZA columns to existing DBs
     for col in ["eza_leader_skill", "eza_super_attack", "eza_sa_name", "eza_passive_skill",
-                "eza_max_hp", "eza_max_atk", "eza_max_def"]:
+                "eza_max_hp", "eza_max_atk", "eza_max_def", "card_family"]:
         try:
             c.execute(f"ALTER TABLE cards ADD COLUMN {col} TEXT")
         except Exception:
             pass
+    try:
+        c.execute("ALTER TABLE cards ADD COLUMN is_superseded INTEGER NOT NULL DEFAULT 0")
+    except Exception:
+        pass
+    # Wiki revision a card was parsed from — unchanged pages are skipped on the next sync
+    for col, kind in [("lastrevid", "INTEGER"), ("touched", "TEXT")]:
+        try:
+            c.execute(f"ALTER TABLE cards ADD COLUMN {col} {kind}")
+        except Exception:
+            pass
+    # Revision of every listed title as of its last fetch — including titles that didn't
+    # give a card (non-card pages, parse failures, redirects), so those are skipped too
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS wiki_pages (
+            title     TEXT PRIMARY KEY,
+            lastrevid INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    c.execute("""
+        INSERT OR IGNORE INTO wiki_pages (title, lastrevid)
+        SELECT page_title, lastrevid FROM cards WHERE lastrevid IS NOT NULL
+    """)
+    # Integer copies of the stat columns so the bot can range-filter and sort on them
+    added_stats = []
+    for col in STAT_COLUMNS:
+        try:
+            c.execute(f"ALTER TABLE cards ADD COLUMN {col}_num INTEGER")
+            added_stats.append(col)
+        except Exception:
+            pass
+    if added_stats:
+        conn.create_function("parse_stat", 1, parse_stat, deterministic=True)
+        c.execute("UPDATE cards SET " + ", ".join(f"{col}_num = parse_stat({col})" for col in added_stats))
     c.execute("""
         CREATE INDEX IF NOT EXISTS idx_name ON cards(name);
     """)
@@ -86,31 +167,272 @@ def init_db():
     c.execute("""
         CREATE INDEX IF NOT EXISTS idx_rarity ON cards(rarity);
     """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_family ON cards(card_family, rarity);
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_superseded ON cards(is_superseded, rarity);
+    """)
+    # /filter narrows by type + rarity, then range-scans one stat
+    for stat in ("hp", "atk", "def"):
+        c.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_max_{stat} ON cards(type, rarity, max_{stat}_num);
+        """)
+        c.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_eza_max_{stat} ON cards(type, rarity, eza_max_{stat}_num);
+        """)
+
+    # Full-text index for /card and find_card_url — trigram tokens keep substring
+    # matching ("oku" finds "Goku") without a full table scan
+    fts_exists = c.execute("SELECT 1 FROM sqlite_master WHERE name = 'cards_fts'").fetchone()
+    c.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5(
+            name, title, page_title, sa_name,
+            content='cards', content_rowid='id', tokenize='trigram'
+        )
+    """)
+    # INSERT OR REPLACE only fires the delete trigger with recursive triggers on
+    c.execute("PRAGMA recursive_triggers = ON")
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS cards_fts_insert AFTER INSERT ON cards BEGIN
+            INSERT INTO cards_fts (rowid, name, title, page_title, sa_name)
+            VALUES (new.id, new.name, new.title, new.page_title, new.sa_name);
+        END
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS cards_fts_delete AFTER DELETE ON cards BEGIN
+            INSERT INTO cards_fts (cards_fts, rowid, name, title, page_title, sa_name)
+            VALUES ('delete', old.id, old.name, old.title, old.page_title, old.sa_name);
+        END
+    """)
+    # Only re-index when a searched column changes, not on every bookkeeping UPDATE
+    c.execute("DROP TRIGGER IF EXISTS cards_fts_update")
+    c.execute("""
+        CREATE TRIGGER cards_fts_update AFTER UPDATE OF name, title, page_title, sa_name ON cards BEGIN
+            INSERT INTO cards_fts (cards_fts, rowid, name, title, page_title, sa_name)
+            VALUES ('delete', old.id, old.name, old.title, old.page_title, old.sa_name);
+            INSERT INTO cards_fts (rowid, name, title, page_title, sa_name)
+            VALUES (new.id, new.name, new.title, new.page_title, new.sa_name);
+        END
+    """)
+    if not fts_exists:
+        # First run on an existing DB — index the cards already stored
+        c.execute("INSERT INTO cards_fts (cards_fts) VALUES ('rebuild')")
+
+    # Link skills and categories as integer-keyed lookup tables, so the bot can
+    # join on them instead of LIKE-matching and re-splitting the TEXT columns
+    terms_exist = c.execute("SELECT 1 FROM sqlite_master WHERE name = 'card_links'").fetchone()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS link_skills (
+            id   INTEGER PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL COLLATE NOCASE
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS categories (
+            id   INTEGER PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL COLLATE NOCASE
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS card_links (
+            card_id  INTEGER NOT NULL,
+            link_id  INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            PRIMARY KEY (card_id, link_id)
+        ) WITHOUT ROWID
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS card_categories (
+            card_id     INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            position    INTEGER NOT NULL,
+            PRIMARY KEY (card_id, category_id)
+        ) WITHOUT ROWID
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_link_cards ON card_links(link_id, card_id);
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_category_cards ON card_categories(category_id, card_id);
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS cards_terms_delete AFTER DELETE ON cards BEGIN
+            DELETE FROM card_links WHERE card_id = old.id;
+            DELETE FROM card_categories WHERE card_id = old.id;
+        END
+    """)
+    if not terms_exist:
+        # First run on an existing DB — split the links/categories already stored
+        store_card_terms(conn, c.execute("SELECT id, links, categories FROM cards").fetchall())
+
+    # Leader skills broken down into who they boost and by how much — one row per target
+    leaders_exist = c.execute("SELECT 1 FROM sqlite_master WHERE name = 'leader_skills'").fetchone()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS leader_skills (
+            card_id    INTEGER NOT NULL,
+            eza        INTEGER NOT NULL DEFAULT 0,
+            position   INTEGER NOT NULL,
+            kind       TEXT NOT NULL,
+            target     TEXT COLLATE NOCASE,
+            ki         INTEGER NOT NULL DEFAULT 0,
+            hp_pct     INTEGER NOT NULL DEFAULT 0,
+            atk_pct    INTEGER NOT NULL DEFAULT 0,
+            def_pct    INTEGER NOT NULL DEFAULT 0,
+            stat_total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (card_id, eza, position)
+        ) WITHOUT ROWID
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_leader_target ON leader_skills(kind, target, stat_total DESC, ki DESC);
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS cards_leader_delete AFTER DELETE ON cards BEGIN
+            DELETE FROM leader_skills WHERE card_id = old.id;
+        END
+    """)
+    if not leaders_exist:
+        # First run on an existing DB — parse the leader skills already stored
+        store_leader_skills(conn, [
+            (card_id, parse_leader_skill(skill), parse_leader_skill(eza_skill))
+            for card_id, skill, eza_skill in c.execute("SELECT id, leader_skill, eza_leader_skill FROM cards").fetchall()
+        ])
     conn.commit()
     return conn
 
 # ======================
 # WIKI API HELPERS
 # ======================
-async def api_get(session: aiohttp.ClientSession, params: dict):
-    params["format"] = "json"
+class RateLimiter:
+    """Token bucket shared by every wiki request, which a 429 / Retry-After can pause"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+def retry_after_seconds(value: str):
+    """Seconds to wait from a Retry-After header (delay or HTTP date), or None"""
+    if not value:
+        return None
     try:
-        async with session.get(
-            WIKI_API,
-            params=params,
-            headers=HEADERS,
-            timeout=aiohttp.ClientTimeout(total=20)
-        ) as resp:
-            if resp.status == 200:
-                return await resp.json(content_type=None)
-    except Exception as e:
-        print(f"  ❌ API error: {e}")
-    return None
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+class WikiFetcher:
+    """Wiki API client for the sync: rate limited, retrying, with adaptive concurrency.
+
+    Requests in flight grow by one after a window of healthy responses and shrink
+    on slow ones; a 429 or Retry-After halves them and pauses the rate limiter.
+    Timeouts, connection errors and 5xx responses are retried with backoff.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession):
+        self.session = session
+        self.limiter = RateLimiter(RATE_LIMIT, RATE_BURST)
+        self.concurrency = MIN_CONCURRENCY
+        self.active = 0
+        self.slots = asyncio.Condition()
+        self.healthy = 0
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+
+    async def _acquire_slot(self):
+        async with self.slots:
+            await self.slots.wait_for(lambda: self.active < self.concurrency)
+            self.active += 1
+
+    async def _release_slot(self):
+        async with self.slots:
+            self.active -= 1
+            self.slots.notify_all()
+
+    def _record(self, latency: float):
+        if latency > LATENCY_TARGET:
+            self.concurrency = max(MIN_CONCURRENCY, self.concurrency - 1)
+            self.healthy = 0
+            return
+        self.healthy += 1
+        if self.healthy >= self.concurrency:
+            self.concurrency = min(MAX_CONCURRENCY, self.concurrency + 1)
+            self.healthy = 0
+
+    def _throttle(self, wait):
+        self.throttled += 1
+        self.concurrency = max(MIN_CONCURRENCY, self.concurrency // 2)
+        self.healthy = 0
+        self.limiter.pause(wait if wait is not None else RETRY_BACKOFF)
+
+    async def get(self, params: dict):
+        """JSON response for an API query, or None once retries run out"""
+        params = {**params, "format": "json"}
+        error = None
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+            await self._acquire_slot()
+            try:
+                await self.limiter.acquire()
+                start = time.monotonic()
+                self.requests += 1
+                async with self.session.get(
+                    WIKI_API,
+                    params=params,
+                    headers=HEADERS,
+                    timeout=aiohttp.ClientTimeout(total=20)
+                ) as resp:
+                    if resp.status == 200:
+                        data = await resp.json(content_type=None)
+                        self._record(time.monotonic() - start)
+                        return data
+                    error = f"HTTP {resp.status}"
+                    wait = retry_after_seconds(resp.headers.get("Retry-After"))
+                    if resp.status == 429 or wait is not None:
+                        self._throttle(wait)
+                    elif resp.status < 500:
+                        break
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                error = str(e) or type(e).__name__
+            finally:
+                await self._release_slot()
+        print(f"  ❌ API error: {error}")
+        return None
 
-async def get_all_card_titles(session: aiohttp.ClientSession):
-    """Get all card page titles from the wiki using category members"""
+    def status(self) -> str:
+        return f"⚡ {self.concurrency} in flight | 🔁 {self.retries} retries | 🐢 {self.throttled} throttled"
+
+async def get_all_card_titles(fetcher: WikiFetcher) -> dict:
+    """Get all card page titles from the wiki using category members, as title -> latest revision id"""
     print("📋 Fetching all card page titles from wiki...")
-    titles = set()
+    titles = {}
 
     # Try multiple categories to get full coverage
     categories = [
@@ -124,48 +446,80 @@ async def get_all_card_titles(session: aiohttp.ClientSession):
 
     for category in categories:
         print(f"  📂 Fetching {category}...")
+        # Members as a generator so prop=info gives each page's revision id in the same call
         params = {
             "action": "query",
-            "list": "categorymembers",
-            "cmtitle": category,
-            "cmlimit": 500,
-            "cmtype": "page"
+            "generator": "categorymembers",
+            "gcmtitle": category,
+            "gcmlimit": 500,
+            "gcmtype": "page",
+            "prop": "info",
+            "formatversion": "2",
         }
 
         while True:
-            data = await api_get(session, params)
+            data = await fetcher.get(params)
             if not data:
                 break
 
-            members = data.get("query", {}).get("categorymembers", [])
-            for m in members:
-                titles.add(m["title"])
+            for page in data.get("query", {}).get("pages", []):
+                titles[page["title"]] = page.get("lastrevid")
 
-            cont = data.get("continue", {}).get("cmcontinue")
-            if cont:
-                params["cmcontinue"] = cont
-                await asyncio.sleep(0.2)
+            if "continue" in data:
+                params.update(data["continue"])
             else:
                 break
 
         print(f"    ✅ {len(titles)} total so far")
-        await asyncio.sleep(0.3)
 
-    titles = list(titles)
     print(f"  ✅ Found {len(titles)} card pages total")
     return titles
 
-async def get_wikitext(session: aiohttp.ClientSession, page_title: str):
-    """Fetch raw wikitext for a page"""
-    data = await api_get(session, {
-        "action": "parse",
-        "page": page_title,
-        "prop": "wikitext",
-        "formatversion": "2"
-    })
-    if not data:
-        return None
-    return data.get("parse", {}).get("wikitext", "")
+async def get_wikitexts(fetcher: WikiFetcher, titles: list):
+    """Raw wikitext for up to REVISION_BATCH pages in one query+revisions call.
+
+    Returns requested title -> (page title, wikitext, revision info), following
+    normalization and redirects to the page actually read; missing pages come back
+    with "" wikitext. None if the request failed.
+    """
+    params = {
+        "action": "query",
+        "prop": "info|revisions",
+        "rvprop": "content|ids",
+        "rvslots": "main",
+        "titles": "|".join(titles),
+        "redirects": "1",
+        "formatversion": "2",
+    }
+    renamed, pages, info = {}, {}, {}
+    while True:
+        data = await fetcher.get(params)
+        if not data:
+            return None
+        query = data.get("query", {})
+        for change in query.get("normalized", []) + query.get("redirects", []):
+            renamed[change["from"]] = change["to"]
+        for page in query.get("pages", []):
+            if "lastrevid" in page:
+                info[page["title"]] = {"lastrevid": page["lastrevid"], "touched": page.get("touched")}
+            revisions = page.get("revisions")
+            if revisions:
+                pages[page["title"]] = revisions[0].get("slots", {}).get("main", {}).get("content", "")
+            else:
+                pages.setdefault(page["title"], "")
+        # Large batches come back in parts — ask for the rest
+        if "continue" not in data:
+            break
+        params.update(data["continue"])
+
+    result = {}
+    for title in titles:
+        page_title, seen = title, set()
+        while page_title in renamed and page_title not in seen:
+            seen.add(page_title)
+            page_title = renamed[page_title]
+        result[title] = (page_title, pages.get(page_title, ""), info.get(page_title, {}))
+    return result
 
 # ======================
 # WIKITEXT PARSER
@@ -199,6 +553,72 @@ def extract_field(wikitext: str, *fields):
             return clean_wiki(match.group(1))
     return None
 
+def parse_stat(raw: str):
+    """Integer value of a stat field ("12,345" -> 12345), None for blanks and N/A"""
+    match = re.search(r"\d[\d,]*", raw or "")
+    return int(match.group(0).replace(",", "")) if match else None
+
+def split_terms(raw: str) -> list:
+    """Split a links/categories string into unique names, in order.
+
+    Handles both the "|" the parser writes and the " - " the wiki uses, including
+    one-sided hyphens like "Kamehameha- Shocking Speed" (but not "Earth-Bred").
+    """
+    terms = []
+    for term in re.split(r"\s+-\s*|\s*-\s+|\|", raw or ""):
+        term = term.strip(" -")
+        if term and term.lower() not in (t.lower() for t in terms):
+            terms.append(term)
+    return terms
+
+LEADER_STATS_RE = re.compile(r"((?:HP|ATK|DEF)(?:\s*(?:,|&|and)\s*(?:HP|ATK|DEF))*)\s*\+\s*(\d+)%")
+
+def parse_leader_skill(text: str) -> list:
+    """Break a leader skill into one dict per boosted target.
+
+    Each "; or" alternative (and each line) is parsed on its own. Every quoted
+    category in it becomes a row with that alternative's Ki and HP/ATK/DEF boosts.
+    Targets: category (by name), class ("Super"/"Extreme"), type (the wiki's type
+    icons are stripped, so no name) or all. The "plus an additional ... for characters
+    who also belong to" bonus is ignored.
+    """
+    rows = []
+    for clause in re.split(r";\s*(?:or\b)?|\n", text or ""):
+        clause = re.split(r"\bplus an additional\b", clause, flags=re.IGNORECASE)[0]
+        clause = clause.strip(" ,&").removeprefix("or ").removeprefix("and ").strip()
+        if not clause:
+            continue
+
+        ki = re.search(r"\bKi\s*\+\s*(\d+)", clause)
+        stats = {"HP": 0, "ATK": 0, "DEF": 0}
+        for names, pct in LEADER_STATS_RE.findall(clause):
+            for stat in re.findall(r"HP|ATK|DEF", names):
+                stats[stat] = stats[stat] or int(pct)
+        if not ki and not any(stats.values()):
+            continue
+
+        targets = []
+        category = re.search(r'((?:"[^"]+"[\s,&]*(?:or\s+|and\s+)?)+)Categor(?:y|ies)', clause)
+        if category:
+            targets += [("category", name.strip()) for name in re.findall(r'"([^"]+)"', category.group(1))]
+        else:
+            targets += [("category", name.strip()) for name in re.findall(r"([A-Z][A-Za-z' ]+?)\s+Category", clause)]
+        targets += [("class", cls) for cls in re.findall(r"\b(Super|Extreme)\s+Class", clause)]
+        if re.search(r"\bAll Types\b|\bfor all Types\b", clause, re.IGNORECASE):
+            targets.append(("all", None))
+        elif re.search(r"\bType\b", clause):
+            targets.append(("type", None))
+        if not targets:
+            targets.append(("all", None))
+
+        for kind, target in targets:
+            rows.append({
+                "kind": kind, "target": target, "ki": int(ki.group(1)) if ki else 0,
+                "hp_pct": stats["HP"], "atk_pct": stats["ATK"], "def_pct": stats["DEF"],
+                "stat_total": sum(stats.values()),
+            })
+    return rows
+
 def clean_type(raw: str) -> str:
     raw = raw.upper().strip()
     for t in ["AGL", "TEQ", "INT", "STR", "PHY"]:
@@ -252,6 +672,12 @@ def parse_wikitext(wikitext: str, page_title: str):
     card["eza_max_atk"]       = extract_field(wikitext, "EZA ATK", "eza atk", "ATK_eza", "atk_eza")
     card["eza_max_def"]       = extract_field(wikitext, "EZA DEF", "eza def", "DEF_eza", "def_eza")
 
+    for col in STAT_COLUMNS:
+        card[f"{col}_num"] = parse_stat(card[col])
+
+    card["leader_rows"]     = parse_leader_skill(card["leader_skill"])
+    card["eza_leader_rows"] = parse_leader_skill(card["eza_leader_skill"])
+
 
     # Links - wiki stores all links in single "Link_skill" field, pipe separated
     link_skill = extract_field(wikitext, "Link_skill", "Link skill", "link_skill", "links")
@@ -302,50 +728,334 @@ def parse_wikitext(wikitext: str, page_title: str):
 # ======================
 # SYNC LOGIC
 # ======================
+# Columns written by CardWriter, in insert order — page_title is the upsert key
+CARD_COLUMNS = [
+    "page_title", "title", "name", "type", "rarity", "cost", "max_level",
+    "base_hp", "base_atk", "base_def", "max_hp", "max_atk", "max_def",
+    "leader_skill", "super_attack", "sa_name", "passive_skill",
+    "links", "categories", "image", "wiki_url", "synced_at",
+    "eza_leader_skill", "eza_super_attack", "eza_sa_name", "eza_passive_skill",
+    "eza_max_hp", "eza_max_atk", "eza_max_def", "lastrevid", "touched",
+] + [f"{col}_num" for col in STAT_COLUMNS]
+
+def refresh_card_families(conn: sqlite3.Connection):
+    """Group cards by character and flag URs that have an LR of the same character.
+
+    The bot hides superseded URs from searches unless a rarity is asked for — storing
+    the flag lets it filter in SQL instead of post-processing every result list.
+    """
+    conn.execute("""
+        UPDATE cards SET card_family = lower(trim(name))
+        WHERE card_family IS NOT lower(trim(name))
+    """)
+    conn.execute("""
+        UPDATE cards SET is_superseded = new.flag
+        FROM (
+            SELECT c.id, (c.rarity = 'UR' AND EXISTS (
+                SELECT 1 FROM cards lr WHERE lr.card_family = c.card_family AND lr.rarity = 'LR'
+            )) AS flag
+            FROM cards c
+        ) AS new
+        WHERE cards.id = new.id AND cards.is_superseded IS NOT new.flag
+    """)
+    conn.commit()
+
+def store_card_terms(conn: sqlite3.Connection, cards: list):
+    """Replace the card_links / card_categories rows of each (card_id, links, categories)"""
+    for table, join_table, key, field in (
+        ("link_skills", "card_links", "link_id", 1),
+        ("categories", "card_categories", "category_id", 2),
+    ):
+        conn.executemany(f"DELETE FROM {join_table} WHERE card_id = ?", [(card[0],) for card in cards])
+        terms = [
+            (card[0], position, term)
+            for card in cards
+            for position, term in enumerate(split_terms(card[field]))
+        ]
+        conn.executemany(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", [(term,) for _, _, term in terms])
+        conn.executemany(f"""
+            INSERT OR IGNORE INTO {join_table} (card_id, {key}, position)
+            SELECT ?, id, ? FROM {table} WHERE name = ?
+        """, terms)
+
+def store_leader_skills(conn: sqlite3.Connection, cards: list):
+    """Replace the parsed leader skill rows of each (card_id, base rows, EZA rows)"""
+    conn.executemany("DELETE FROM leader_skills WHERE card_id = ?", [(card[0],) for card in cards])
+    conn.executemany("""
+        INSERT INTO leader_skills (card_id, eza, position, kind, target, ki, hp_pct, atk_pct, def_pct, stat_total)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (card_id, eza, position, row["kind"], row["target"], row["ki"],
+         row["hp_pct"], row["atk_pct"], row["def_pct"], row["stat_total"])
+        for card_id, rows, eza_rows in cards
+        for eza, skill_rows in ((0, rows), (1, eza_rows))
+        for position, row in enumerate(skill_rows)
+    ])
+
+class CardWriter:
+    """Collects parsed cards and writes them with executemany, one transaction per flush"""
+
+    def __init__(self, conn: sqlite3.Connection, flush_size: int = FLUSH_SIZE):
+        self.conn = conn
+        self.flush_size = max(1, flush_size)
+        self.pending = []
+        self.written = 0
+        self.write_time = 0.0
+
+    def add(self, card: dict):
+        self.pending.append(card)
+        if len(self.pending) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        start = time.perf_counter()
+        cards, self.pending = self.pending, []
+        with self.conn:
+            # Upsert in place (not INSERT OR REPLACE) so a card keeps its id across syncs
+            self.conn.executemany(f"""
+                INSERT INTO cards ({", ".join(CARD_COLUMNS)})
+                VALUES ({", ".join("?" for _ in CARD_COLUMNS)})
+                ON CONFLICT(page_title) DO UPDATE SET
+                    {", ".join(f"{col} = excluded.{col}" for col in CARD_COLUMNS[1:])}
+            """, [[card.get(col) for col in CARD_COLUMNS] for card in cards])
+            titles = [card["page_title"] for card in cards]
+            ids = dict(self.conn.execute(
+                f"SELECT page_title, id FROM cards WHERE page_title IN ({', '.join('?' for _ in titles)})", titles
+            ))
+            store_card_terms(self.conn, [
+                (ids[card["page_title"]], card.get("links"), card.get("categories")) for card in cards
+            ])
+            store_leader_skills(self.conn, [
+                (ids[card["page_title"]], card["leader_rows"], card["eza_leader_rows"]) for card in cards
+            ])
+        self.written += len(cards)
+        self.write_time += time.perf_counter() - start
+
+def read_synergy(path: str = None):
+    """(card ids, matrix) from an existing synergy file, or None if it's missing or unusable"""
+    path = path or SYNERGY_PATH   # looked up per call, so a changed SYNERGY_PATH is honoured
+    try:
+        with open(path, "rb") as f:
+            magic, version, count, _ = SYNERGY_HEADER.unpack(f.read(SYNERGY_HEADER.size))
+            if magic != SYNERGY_MAGIC or version != SYNERGY_VERSION:
+                return None
+            ids = np.frombuffer(f.read(count * 8), dtype="<i8")
+            matrix = np.frombuffer(f.read(count * count), dtype=np.uint8).reshape(count, count)
+        return ids, matrix
+    except (OSError, ValueError, struct.error):
+        return None
+
+def write_synergy(conn: sqlite3.Connection, changed_ids=None):
+    """Write the card x card shared-link count matrix for the bot.
+
+    With changed_ids (an --update run) the previous file is reused and only the
+    rows and columns of changed or new cards are recomputed.
+    """
+    start = time.time()
+    ids = np.array([row[0] for row in conn.execute("SELECT id FROM cards ORDER BY id")], dtype="<i8")
+    index = {int(card_id): i for i, card_id in enumerate(ids)}
+    pairs = [(index[card_id], link_id) for card_id, link_id in conn.execute("SELECT card_id, link_id FROM card_links")
+             if card_id in index]
+    width = max((link_id for _, link_id in pairs), default=0) + 1
+    membership = np.zeros((len(ids), width), dtype=np.float32)
+    if pairs:
+        rows, cols = zip(*pairs)
+        membership[list(rows), list(cols)] = 1
+
+    previous = read_synergy() if changed_ids is not None else None
+    if previous is None:
+        matrix = np.minimum(membership @ membership.T, 255).astype(np.uint8)
+        refreshed = len(ids)
+    else:
+        old_ids, old_matrix = previous
+        old_index = {int(card_id): i for i, card_id in enumerate(old_ids)}
+        changed = set(changed_ids)
+        kept = [i for i, card_id in enumerate(ids) if int(card_id) in old_index and int(card_id) not in changed]
+        stale = [i for i, card_id in enumerate(ids) if int(card_id) not in old_index or int(card_id) in changed]
+        old_kept = [old_index[int(ids[i])] for i in kept]
+        matrix = np.empty((len(ids), len(ids)), dtype=np.uint8)
+        n_old = len(old_ids)
+        if n_old <= len(ids) and np.array_equal(ids[:n_old], old_ids):
+            # Usual case: nothing removed, new cards have higher ids — copy the old block whole
+            matrix[:n_old, :n_old] = old_matrix
+        else:
+            matrix[np.ix_(kept, kept)] = old_matrix[np.ix_(old_kept, old_kept)]
+        if stale:
+            block = np.minimum(membership[stale] @ membership.T, 255).astype(np.uint8)
+            matrix[stale, :] = block
+            matrix[:, stale] = block.T
+        refreshed = len(stale)
+
+    # Write to a temp file and swap it in, so the bot never maps a half-written file
+    tmp_path = SYNERGY_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SYNERGY_HEADER.pack(SYNERGY_MAGIC, SYNERGY_VERSION, len(ids), 0))
+        f.write(ids.tobytes())
+        f.write(matrix.tobytes())
+    os.replace(tmp_path, SYNERGY_PATH)
+    print(f"  🔗 Synergy matrix: {len(ids)} cards, {refreshed} rows refreshed ({time.time() - start:.2f}s)")
+
 def is_card_page(wikitext: str) -> bool:
     """Check if this wikitext is actually a card page"""
     return "{{Characters" in wikitext or "rarity" in wikitext.lower()
 
-async def sync_card(session: aiohttp.ClientSession, conn: sqlite3.Connection, title: str):
-    """Fetch and store a single card"""
-    wikitext = await get_wikitext(session, title)
+class WikitextCache:
+    """Local store of fetched wikitext, keyed by (page title, revision id).
+
+    Content is stored once per distinct text (by SHA-256, zlib-compressed), so
+    revisions that don't change the text and redirect duplicates cost nothing extra.
+    Only the newest revision of each page is kept: older ones and the blobs nothing
+    refers to any more are pruned on close().
+    """
+
+    def __init__(self, path: str = None, flush_size: int = FLUSH_SIZE):
+        self.conn = sqlite3.connect(path or WIKITEXT_CACHE_PATH)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                data   BLOB NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS revisions (
+                page_title TEXT NOT NULL,
+                revid      INTEGER NOT NULL,
+                touched    TEXT,
+                sha256     TEXT NOT NULL,
+                fetched_at TEXT,
+                PRIMARY KEY (page_title, revid)
+            ) WITHOUT ROWID;
+        """)
+        self.flush_size = max(1, flush_size)
+        self.pending = []
+
+    def put(self, page_title: str, wikitext: str, info: dict):
+        if not wikitext:
+            return
+        raw = wikitext.encode("utf-8")
+        self.pending.append((page_title, info.get("lastrevid") or 0, info.get("touched"),
+                             hashlib.sha256(raw).hexdigest(), raw))
+        if len(self.pending) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        entries, self.pending = self.pending, []
+        now = datetime.utcnow().isoformat()
+        with self.conn:
+            known = {sha for sha, in self.conn.execute(
+                f"SELECT sha256 FROM blobs WHERE sha256 IN ({', '.join('?' for _ in entries)})",
+                [entry[3] for entry in entries]
+            )}
+            self.conn.executemany("INSERT OR IGNORE INTO blobs (sha256, data) VALUES (?, ?)", [
+                (sha, zlib.compress(raw, 9)) for _, _, _, sha, raw in entries if sha not in known
+            ])
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO revisions (page_title, revid, touched, sha256, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(title, revid, touched, sha, now) for title, revid, touched, sha, _ in entries])
+
+    def latest(self):
+        """(page title, wikitext, revision info) for the newest cached revision of every page"""
+        rows = self.conn.execute("""
+            SELECT r.page_title, r.revid, r.touched, b.data
+            FROM (SELECT page_title, MAX(revid) AS revid, touched, sha256 FROM revisions GROUP BY page_title) r
+            JOIN blobs b ON b.sha256 = r.sha256
+        """)
+        for page_title, revid, touched, data in rows:
+            yield page_title, zlib.decompress(data).decode("utf-8"), {"lastrevid": revid or None, "touched": touched}
+
+    def prune(self):
+        with self.conn:
+            self.conn.execute("""
+                DELETE FROM revisions WHERE (page_title, revid) NOT IN
+                    (SELECT page_title, MAX(revid) FROM revisions GROUP BY page_title)
+            """)
+            self.conn.execute("DELETE FROM blobs WHERE sha256 NOT IN (SELECT sha256 FROM revisions)")
+
+    def titles(self) -> set:
+        return {title for title, in self.conn.execute("SELECT DISTINCT page_title FROM revisions")}
+
+    def close(self):
+        self.flush()
+        self.prune()
+        self.conn.close()
+
+def parse_card(wikitext: str, title: str):
+    """Parsed card ready for CardWriter, or None if the page isn't a usable card"""
     if not wikitext or not is_card_page(wikitext):
-        return False
+        return None
 
     card = parse_wikitext(wikitext, title)
 
     # Skip pages with no useful data
     if not card.get("rarity") and not card.get("type"):
-        return False
+        return None
 
-    c = conn.cursor()
-    c.execute("""
-        INSERT OR REPLACE INTO cards (
-            page_title, title, name, type, rarity, cost, max_level,
-            base_hp, base_atk, base_def, max_hp, max_atk, max_def,
-            leader_skill, super_attack, sa_name, passive_skill,
-            links, categories, image, wiki_url, synced_at,
-            eza_leader_skill, eza_super_attack, eza_sa_name, eza_passive_skill,
-            eza_max_hp, eza_max_atk, eza_max_def
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        card["page_title"], card.get("title"), card.get("name"),
-        card.get("type"), card.get("rarity"), card.get("cost"), card.get("max_level"),
-        card.get("base_hp"), card.get("base_atk"), card.get("base_def"),
-        card.get("max_hp"), card.get("max_atk"), card.get("max_def"),
-        card.get("leader_skill"), card.get("super_attack"), card.get("sa_name"),
-        card.get("passive_skill"), card.get("links"), card.get("categories"),
-        card.get("image"), card.get("wiki_url"),
-        datetime.utcnow().isoformat(),
-        card.get("eza_leader_skill"), card.get("eza_super_attack"), card.get("eza_sa_name"),
-        card.get("eza_passive_skill"), card.get("eza_max_hp"), card.get("eza_max_atk"), card.get("eza_max_def")
-    ))
-    conn.commit()
-    return True
+    card["synced_at"] = datetime.utcnow().isoformat()
+    return card
 
-async def get_recently_modified_titles(session: aiohttp.ClientSession, hours: int = 24) -> list:
+async def sync_cards(fetcher: WikiFetcher, titles: list, cache: WikitextCache = None) -> list:
+    """Fetch and parse a batch of cards as (title, card or None if it's not a card page)"""
+    wikitexts = await get_wikitexts(fetcher, titles)
+    if wikitexts is None:
+        raise RuntimeError("wiki request failed after retries")
+    results = []
+    for title in titles:
+        page_title, wikitext, info = wikitexts[title]
+        if cache:
+            cache.put(page_title, wikitext, info)
+        card = parse_card(wikitext, page_title)
+        if card:
+            card.update(info)
+        results.append((title, card))
+    return results
+
+async def fetch_cards(fetcher: WikiFetcher, titles: list, on_result, status, cache: WikitextCache = None):
+    """Run sync_cards over titles, REVISION_BATCH at a time, from a pool of workers,
+    printing throughput as it goes.
+
+    on_result(title, card or exception) is called as each card finishes; status()
+    supplies the synced/skipped/failed part of the progress line.
+    """
+    queue = asyncio.Queue()
+    for i in range(0, len(titles), REVISION_BATCH):
+        queue.put_nowait(titles[i:i + REVISION_BATCH])
+    done = 0
+    start = time.monotonic()
+
+    async def worker():
+        nonlocal done
+        while not queue.empty():
+            batch = queue.get_nowait()
+            try:
+                results = await sync_cards(fetcher, batch, cache)
+            except Exception as e:
+                results = [(title, e) for title in batch]
+            for title, result in results:
+                on_result(title, result)
+            done += len(batch)
+
+    def progress():
+        elapsed = max(time.monotonic() - start, 1e-9)
+        print(f"  Progress: {done}/{len(titles)} | 🚀 {done / elapsed:.1f} cards/s | {fetcher.status()} | {status()}")
+
+    async def reporter():
+        while True:
+            await asyncio.sleep(PROGRESS_EVERY)
+            progress()
+
+    # The fetcher decides how many requests are really in flight; workers just keep it fed
+    report = asyncio.create_task(reporter())
+    try:
+        await asyncio.gather(*(worker() for _ in range(min(MAX_CONCURRENCY, queue.qsize()))))
+    finally:
+        report.cancel()
+    progress()
+
+async def get_recently_modified_titles(fetcher: WikiFetcher, hours: int = 24) -> list:
     """Get card page titles modified on the wiki in the last N hours"""
-    url = "https://dbz-dokkanbattle.fandom.com/api.php"
     cutoff = (datetime.utcnow() - timedelta(hours=hours)).strftime("%Y-%m-%dT%H:%M:%SZ")
     titles = []
     rccontinue = None
@@ -360,95 +1070,129 @@ async def get_recently_modified_titles(session: aiohttp.ClientSession, hours: in
             "rcnamespace": "0",
             "rctype": "edit|new",
             "rcprop": "title",
-            "format": "json",
         }
         if rccontinue:
             params["rccontinue"] = rccontinue
 
-        try:
-            async with session.get(url, params=params) as resp:
-                data = await resp.json()
-                changes = data.get("query", {}).get("recentchanges", [])
-                for change in changes:
-                    title = change.get("title", "")
-                    if title and ":" not in title:  # skip File:, Category: etc
-                        titles.append(title)
-                if "continue" in data:
-                    rccontinue = data["continue"].get("rccontinue")
-                else:
-                    break
-        except Exception as e:
-            print(f"⚠️  Error fetching recent changes: {e}")
+        data = await fetcher.get(params)
+        if not data:
+            print(f"⚠️  Error fetching recent changes")
+            break
+        changes = data.get("query", {}).get("recentchanges", [])
+        for change in changes:
+            title = change.get("title", "")
+            if title and ":" not in title:  # skip File:, Category: etc
+                titles.append(title)
+        if "continue" in data:
+            rccontinue = data["continue"].get("rccontinue")
+        else:
             break
 
     return list(set(titles))
 
-async def sync_all(update_only: bool = False, resync: bool = False):
+async def sync_all(update_only: bool = False, resync: bool = False, flush_size: int = FLUSH_SIZE, force: bool = False):
     conn = init_db()
+    writer = CardWriter(conn, flush_size)
     print(f"🗄️  Database: {DB_PATH}")
     if update_only:
         print(f"🔄 Mode: Update (new cards + recently edited + upcoming schedule)")
+    elif force:
+        print(f"🔄 Mode: Force (refetch every card, community teams preserved)")
     elif resync:
-        print(f"🔄 Mode: Resync all (updates all fields, community teams preserved)")
+        print(f"🔄 Mode: Resync (cards whose wiki page changed, community teams preserved)")
     else:
         print(f"🔄 Mode: Full sync")
     print(f"⏰ Started: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}\n")
 
     async with aiohttp.ClientSession() as session:
-        all_titles = await get_all_card_titles(session)
+        fetcher = WikiFetcher(session)
+        all_titles = await get_all_card_titles(fetcher)
+        # Revision each listed title was last fetched at, cards or not
+        stored = dict(conn.execute("SELECT title, lastrevid FROM wiki_pages"))
+
+        def changed(title):
+            revid = all_titles.get(title)
+            return revid is None or stored.get(title) != revid
 
         if update_only:
             c = conn.cursor()
             existing = {row[0] for row in c.execute("SELECT page_title FROM cards")}
 
-            # New cards not in DB yet
-            new_titles = [t for t in all_titles if t not in existing]
+            # New cards not in DB yet — skipping redirects and non-card pages already fetched at this revision
+            new_titles = [t for t in all_titles if t not in existing and changed(t)]
             print(f"  🆕 {len(new_titles)} new cards found")
 
             # Recently edited cards on the wiki (last 24 hours)
             print(f"  🔍 Checking wiki for recent edits...")
-            recent_titles = await get_recently_modified_titles(session, hours=24)
+            recent_titles = await get_recently_modified_titles(fetcher, hours=24)
             # Only keep ones that are actual card pages
             all_titles_set = set(all_titles)
-            recent_card_titles = [t for t in recent_titles if t in all_titles_set]
+            recent_card_titles = [t for t in recent_titles if t in all_titles_set and changed(t)]
             print(f"  ✏️  {len(recent_card_titles)} recently edited cards found")
 
             # Combine — deduplicate
             titles = list(set(new_titles + recent_card_titles))
             print(f"  📝 {len(titles)} total cards to sync\n")
-        elif resync:
-            titles = all_titles
+        elif force:
+            titles = list(all_titles)
             print(f"  📝 Re-syncing all {len(titles)} cards (community teams safe)\n")
         else:
-            titles = all_titles
+            # Only pages edited since the revision they were last fetched at
+            titles = [t for t in all_titles if changed(t)]
+            print(f"  ⏭️  {len(all_titles) - len(titles)} pages unchanged since their last sync")
+            print(f"  📝 {len(titles)} cards to sync (use --force to re-sync everything)\n")
 
         total   = len(titles)
+        synced_titles = []
+        synced_pages  = set()
+        fetched = {}   # title -> listed revision, for every title fetched without an error
         synced  = 0
         skipped = 0
         failed  = 0
 
-        # Process in batches
-        for i in range(0, total, BATCH_SIZE):
-            batch = titles[i:i + BATCH_SIZE]
-            tasks = [sync_card(session, conn, title) for title in batch]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for title, result in zip(batch, results):
-                if isinstance(result, Exception):
-                    print(f"  ❌ Error on '{title}': {result}")
-                    failed += 1
-                elif result:
-                    synced += 1
-                else:
-                    skipped += 1
-
-            progress = min(i + BATCH_SIZE, total)
-            print(f"  Progress: {progress}/{total} | ✅ Synced: {synced} | ⏭️ Skipped: {skipped} | ❌ Failed: {failed}")
+        def on_result(title, result):
+            nonlocal synced, skipped, failed
+            if isinstance(result, Exception):
+                print(f"  ❌ Error on '{title}': {result}")
+                failed += 1
+                return
+            if all_titles.get(title) is not None:
+                fetched[title] = all_titles[title]
+            if result and result["page_title"] not in synced_pages:
+                # Titles that redirect to an already synced page are skipped
+                writer.add(result)
+                synced += 1
+                synced_titles.append(result["page_title"])
+                synced_pages.add(result["page_title"])
+            else:
+                skipped += 1
 
-            await asyncio.sleep(DELAY)
+        cache = WikitextCache(flush_size=flush_size)
+        try:
+            await fetch_cards(
+                fetcher, titles, on_result,
+                lambda: f"✅ Synced: {synced} | ⏭️ Skipped: {skipped} | ❌ Failed: {failed}",
+                cache
+            )
+        finally:
+            cache.close()
+
+        writer.flush()
+        with conn:
+            conn.executemany("""
+                INSERT INTO wiki_pages (title, lastrevid) VALUES (?, ?)
+                ON CONFLICT(title) DO UPDATE SET lastrevid = excluded.lastrevid
+            """, fetched.items())
+        refresh_card_families(conn)
+
+        changed_ids = None
+        if not force:
+            id_by_title = dict(conn.execute("SELECT page_title, id FROM cards"))
+            changed_ids = [id_by_title[t] for t in synced_titles if t in id_by_title]
+        write_synergy(conn, changed_ids)
 
         # Sync schedule while session is still open
-        await sync_schedule(session, conn)
+        await sync_schedule(fetcher, conn)
 
     # Final stats
     c = conn.cursor()
@@ -459,13 +1203,56 @@ async def sync_all(update_only: bool = False, resync: bool = False):
     print(f"   Cards synced this run : {synced}")
     print(f"   Cards skipped         : {skipped}")
     print(f"   Errors                : {failed}")
+    print(f"   DB write time         : {writer.write_time:.2f}s ({writer.written} cards, flush size {writer.flush_size})")
     print(f"   Total cards in DB     : {total_in_db}")
     print(f"⏰ Finished: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}")
 
+def reparse_all(flush_size: int = FLUSH_SIZE):
+    """Rebuild every card from the local wikitext cache — no network access"""
+    if not os.path.exists(WIKITEXT_CACHE_PATH):
+        print(f"❌ No wikitext cache at {WIKITEXT_CACHE_PATH} — run a sync first")
+        return
+    start = time.time()
+    conn = init_db()
+    writer = CardWriter(conn, flush_size)
+    cache = WikitextCache()
+    print(f"🗄️  Database: {DB_PATH}")
+    print(f"🔄 Mode: Reparse (cached wikitext from {WIKITEXT_CACHE_PATH}, no network)\n")
+
+    reparsed = skipped = 0
+    try:
+        for page_title, wikitext, info in cache.latest():
+            card = parse_card(wikitext, page_title)
+            if not card:
+                skipped += 1
+                continue
+            card.update(info)
+            writer.add(card)
+            reparsed += 1
+        # The cache only holds pages fetched since it was added — the rest stay as they are
+        cached = cache.titles()
+    finally:
+        cache.close()
+    writer.flush()
+    uncached = sum(1 for title, in conn.execute("SELECT page_title FROM cards") if title not in cached)
+
+    refresh_card_families(conn)
+    write_synergy(conn)
+    total_in_db = conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+    conn.close()
+
+    print(f"\n✅ Reparse complete in {time.time() - start:.2f}s")
+    print(f"   Cards reparsed    : {reparsed}")
+    print(f"   Pages skipped     : {skipped}")
+    print(f"   Total cards in DB : {total_in_db}")
+    if uncached:
+        print(f"\n⚠️  {uncached} cards have no cached wikitext and were not reparsed — "
+              f"run python sync.py --force once to cache every page")
+
 # ======================
 # SCHEDULE SYNC
 # ======================
-async def sync_schedule(session: aiohttp.ClientSession, conn: sqlite3.Connection):
+async def sync_schedule(fetcher: WikiFetcher, conn: sqlite3.Connection):
     """Fetch upcoming cards from the wiki and save to schedule table"""
     print("\n📅 Syncing upcoming cards schedule...")
 
@@ -488,16 +1275,13 @@ async def sync_schedule(session: aiohttp.ClientSession, conn: sqlite3.Connection
         "page": "Upcoming Cards",
         "prop": "wikitext",
         "formatversion": "2",
-        "format": "json"
     }
 
-    try:
-        async with session.get(WIKI_API, params=params, headers=HEADERS) as resp:
-            data = await resp.json(content_type=None)
-            wikitext = data.get("parse", {}).get("wikitext", "")
-    except Exception as e:
-        print(f"  ❌ Failed to fetch schedule: {e}")
+    data = await fetcher.get(params)
+    if not data:
+        print(f"  ❌ Failed to fetch schedule")
         return 0
+    wikitext = data.get("parse", {}).get("wikitext", "")
 
     if not wikitext:
         print("  ❌ No wikitext returned for Upcoming Cards page")
@@ -563,7 +1347,13 @@ async def sync_schedule(session: aiohttp.ClientSession, conn: sqlite3.Connection
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Dokkan card database sync")
     parser.add_argument("--update", action="store_true", help="Only sync new cards not already in DB")
-    parser.add_argument("--resync", action="store_true", help="Re-sync ALL cards and update all fields (keeps community teams)")
+    parser.add_argument("--resync", action="store_true", help="Re-sync cards whose wiki page changed since the last sync (keeps community teams)")
+    parser.add_argument("--force", action="store_true", help="Re-sync every card, even pages unchanged since the last sync")
+    parser.add_argument("--reparse", action="store_true", help="Re-run the parser over the local wikitext cache, without touching the network")
+    parser.add_argument("--flush-size", type=int, default=FLUSH_SIZE, help=f"Cards written per transaction (default {FLUSH_SIZE})")
     args = parser.parse_args()
 
-    asyncio.run(sync_all(update_only=args.update, resync=args.resync))
\ No newline at end of file
+    if args.reparse:
+        reparse_all(flush_size=args.flush_size)
+    else:
+        asyncio.run(sync_all(update_only=args.update, resync=args.resync, flush_size=args.flush_size, force=args.force))
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""The event loop keeps its heartbeat through a burst of /links lookups run via db.run.
+
+Uses a copy of the dokkan.db shipped with the repository as the fixture DB.
+Run from the repository root with: python -m pytest tests
+"""
+
+import asyncio
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import dokkan_bot
+from dokkan_bot import ConnectionManager, catalog, db_search, find_link_partners
+
+HEARTBEAT = 0.05      # seconds between heartbeats on the loop
+BURST     = 1000      # /links lookups fired at once
+MAX_SHARE = 1 / 3     # longest heartbeat stall allowed, as a share of the burst's duration
+
+
+@pytest.fixture
+def card_names(tmp_path, monkeypatch):
+    """Catalog loaded from a copy of the fixture DB; names of cards that have links"""
+    path = tmp_path / "dokkan.db"
+    shutil.copy(ROOT / "dokkan.db", path)
+    monkeypatch.setattr(dokkan_bot, "DB_PATH", str(path))
+    monkeypatch.setattr(dokkan_bot, "SYNERGY_PATH", str(tmp_path / "dokkan.synergy"))
+    monkeypatch.setattr(dokkan_bot, "db", ConnectionManager(str(path)))
+    catalog.load()
+    names = [card["name"] for card in catalog.cards if card["name"] and catalog.links_of(card)]
+    assert names, "fixture DB has no cards with link skills"
+    return [names[i * len(names) // BURST] for i in range(BURST)]
+
+
+def links_lookup(name: str):
+    """What /links does for one request, minus Discord: find the card, then its partners"""
+    results = db_search(name, None, None, 5)
+    return find_link_partners(results[0], None, None) if results else []
+
+
+async def with_heartbeat(work):
+    """(result of `work`, longest heartbeat stall on the loop as a share of the time it took).
+
+    Relative rather than a fixed number of milliseconds: a busy machine slows the
+    burst and the loop alike, so the share stays put.
+    """
+    start = time.perf_counter()
+    task = asyncio.ensure_future(work)
+    worst = 0.0
+    while not task.done():
+        beat = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT)
+        worst = max(worst, time.perf_counter() - beat - HEARTBEAT)
+    return await task, worst / (time.perf_counter() - start)
+
+
+def test_links_burst_keeps_heartbeat(card_names):
+    async def burst():
+        return await asyncio.gather(*(dokkan_bot.db.run(links_lookup, name, timeout=60) for name in card_names))
+
+    results, stalled = asyncio.run(with_heartbeat(burst()))
+    assert sum(1 for partners in results if partners) > BURST // 2
+    assert stalled < MAX_SHARE
+
+
+def test_links_burst_on_loop_stalls_heartbeat(card_names):
+    # The same burst run straight on the loop, to show the measurement catches a stall
+    async def burst():
+        await asyncio.sleep(0)
+        return [links_lookup(name) for name in card_names]
+
+    results, stalled = asyncio.run(with_heartbeat(burst()))
+    assert sum(1 for partners in results if partners) > BURST // 2
+    assert stalled > 1 - MAX_SHARE